@@ -0,0 +1,182 @@
+import time
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Allow `rate` operations per second on average with bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = 1.0, now: float = None):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        # A bucket with no rate is paused and must not let an initial burst through
+        self.tokens = self.capacity if rate > 0 else 0.0
+        self.updated = time.monotonic() if now is None else now
+
+    def delay(self, now: float = None) -> float:
+        """Seconds until a token is available (0 if one is available now)"""
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float('inf')
+
+    def take(self):
+        self.tokens -= 1
+
+
+class ActionQueue:
+    """Engagement actions paced per endpoint by token buckets
+
+    Callers `put` (endpoint, tweet_id) pairs and return immediately; a
+    background thread calls `dispatch(endpoint, tweet_id)` as each
+    endpoint's bucket allows; an endpoint with a rate of 0 is paused and
+    keeps its actions queued. If dispatch returns a delay in seconds, the
+    action goes back to the head of its queue and the endpoint is paused
+    for that long. The queue itself is in memory only; owners persist
+    `pending()` and re-`put` it on startup.
+    """
+
+    def __init__(self, dispatch: Callable[[str, str], Optional[float]], rates: Dict[str, float],
+                 default_rate: float = 1 / 60, burst: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.dispatch = dispatch
+        self.rates = rates
+        self.default_rate = default_rate
+        self.burst = burst
+        self.clock = clock
+        self._queues = {}
+        self._buckets = {}
+        self._paused_until = {}
+        self._keys = set()
+        self._sequence = 0
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def put(self, endpoint: str, tweet_id: str) -> bool:
+        """Queue an action; returns False if the same action is already pending"""
+        key = (endpoint, str(tweet_id))
+        with self._condition:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            if endpoint not in self._queues:
+                self._queues[endpoint] = deque()
+                self._buckets[endpoint] = TokenBucket(self._rate(endpoint), self.burst, now=self.clock())
+            self._sequence += 1
+            self._queues[endpoint].append((self._sequence, key[1]))
+            self._condition.notify_all()
+        return True
+
+    def discard(self, endpoint: str, tweet_id: str):
+        """Drop a pending action, if it is still queued"""
+        key = (endpoint, str(tweet_id))
+        with self._condition:
+            if key not in self._keys:
+                return
+            self._keys.discard(key)
+            queue = self._queues[endpoint]
+            self._queues[endpoint] = deque(item for item in queue if item[1] != key[1])
+            self._condition.notify_all()
+
+    def pending(self) -> List[Dict]:
+        """Queued actions in enqueue order, as JSON-serializable dicts"""
+        with self._condition:
+            items = sorted(
+                (sequence, endpoint, tweet_id)
+                for endpoint, queue in self._queues.items()
+                for sequence, tweet_id in queue
+            )
+        return [{'endpoint': endpoint, 'tweet_id': tweet_id} for _, endpoint, tweet_id in items]
+
+    def start(self):
+        """Start the background dispatcher thread"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='action-queue', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop dispatching; queued actions stay pending"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+
+    def _rate(self, endpoint: str) -> float:
+        return self.rates.get(endpoint, self.default_rate)
+
+    def join(self, timeout: float = None) -> bool:
+        """Wait until every queued action of an unpaused endpoint has been dispatched; False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._in_flight or any(self._rate(endpoint) > 0 for endpoint, _ in self._keys):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def _next_ready(self):
+        """Pop the oldest action whose endpoint has a token, or return how long to wait"""
+        now = self.clock()
+        ready = None
+        wait = None
+        for endpoint, queue in self._queues.items():
+            if not queue:
+                continue
+            delay = max(self._buckets[endpoint].delay(now), self._paused_until.get(endpoint, 0) - now)
+            if delay <= 0:
+                if ready is None or queue[0][0] < self._queues[ready][0][0]:
+                    ready = endpoint
+            elif wait is None or delay < wait:
+                wait = delay
+        if ready is None:
+            return None, wait
+        self._buckets[ready].take()
+        sequence, tweet_id = self._queues[ready].popleft()
+        self._keys.discard((ready, tweet_id))
+        return (ready, tweet_id, sequence), None
+
+    def _requeue(self, action, delay: float):
+        endpoint, tweet_id, sequence = action
+        if (endpoint, tweet_id) not in self._keys:
+            self._keys.add((endpoint, tweet_id))
+            self._queues[endpoint].appendleft((sequence, tweet_id))
+        self._paused_until[endpoint] = self.clock() + delay
+        logger.info("Pausing %s actions for %.0fs", endpoint, delay)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                action, wait = self._next_ready()
+                if action is None:
+                    # wait is infinite when only paused endpoints have actions
+                    self._condition.wait(None if wait is None or wait == float('inf') else wait)
+                    continue
+                self._in_flight += 1
+            retry_after = None
+            try:
+                retry_after = self.dispatch(action[0], action[1])
+            except Exception as e:
+                logger.error("Error dispatching %s for tweet %s: %s", action[0], action[1], e)
+            finally:
+                with self._condition:
+                    if retry_after:
+                        self._requeue(action, retry_after)
+                    self._in_flight -= 1
+                    self._condition.notify_all()
@@ -0,0 +1,236 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+from array import array
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# One fixed-width file per column; row i of every file describes the same post
+COLUMNS = {
+    'tweet_id': 'Q',
+    'posted_at': 'd',
+    'refreshed_at': 'd',
+    'likes': 'Q',
+    'retweets': 'Q',
+    'replies': 'Q',
+    'quotes': 'Q',
+    'impressions': 'Q',
+    'content_type': 'H',
+    'topic': 'H'
+}
+
+# Hashtags are many-per-post, stored as (row, tag) pairs
+TAG_COLUMNS = {'tag_row': 'I', 'tag': 'H'}
+
+# public_metrics field -> column
+METRIC_FIELDS = {
+    'like_count': 'likes',
+    'retweet_count': 'retweets',
+    'reply_count': 'replies',
+    'quote_count': 'quotes',
+    'impression_count': 'impressions'
+}
+
+DIMENSIONS = ('content_type', 'topic', 'hashtag')
+
+# Twitter only links hashtags that contain at least one letter
+_HASHTAG_PATTERN = re.compile(r"#(\w*[^\W\d_]\w*)")
+
+
+def hashtags(text: str) -> List[str]:
+    """Distinct lower-cased hashtags in a tweet"""
+    return sorted({tag.lower() for tag in _HASHTAG_PATTERN.findall(text or '')})
+
+
+class PerformanceStore:
+    """Columnar on-disk store of post metrics
+
+    Each column is a flat binary file of fixed-width values, so adding a
+    post appends a few bytes per column, refreshing metrics overwrites them
+    in place, and a query reads only the columns it aggregates. Strings
+    (content types, topics, hashtags) are dictionary-encoded; id 0 means
+    unknown.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._dictionary_path = os.path.join(directory, 'dictionary.json')
+        self._dictionaries = {'content_type': [''], 'topic': [''], 'tag': ['']}
+        if os.path.exists(self._dictionary_path):
+            with open(self._dictionary_path, 'r') as f:
+                self._dictionaries.update(json.load(f))
+        self._codes = {name: {value: code for code, value in enumerate(values)}
+                       for name, values in self._dictionaries.items()}
+        self._repair()
+        self._rows = {tweet_id: row for row, tweet_id in enumerate(self.read('tweet_id'))}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, tweet_id) -> bool:
+        return int(tweet_id) in self._rows
+
+    def _path(self, column: str) -> str:
+        return os.path.join(self.directory, f"{column}.bin")
+
+    def _count(self, column: str, typecode: str) -> int:
+        path = self._path(column)
+        return os.path.getsize(path) // array(typecode).itemsize if os.path.exists(path) else 0
+
+    def _repair(self):
+        """Truncate columns to a common length after an interrupted append"""
+        for group in (COLUMNS, TAG_COLUMNS):
+            rows = min(self._count(column, typecode) for column, typecode in group.items())
+            for column, typecode in group.items():
+                if self._count(column, typecode) > rows:
+                    logger.warning("Truncating analytics column %s to %d rows", column, rows)
+                    with open(self._path(column), 'r+b') as f:
+                        f.truncate(rows * array(typecode).itemsize)
+
+    def read(self, column: str) -> array:
+        """Load one column"""
+        typecode = COLUMNS.get(column) or TAG_COLUMNS[column]
+        values = array(typecode)
+        path = self._path(column)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                values.fromfile(f, self._count(column, typecode))
+        return values
+
+    def _append(self, column: str, values: Iterable):
+        typecode = COLUMNS.get(column) or TAG_COLUMNS[column]
+        with open(self._path(column), 'ab') as f:
+            array(typecode, values).tofile(f)
+
+    def _encode(self, dictionary: str, value: str) -> int:
+        if not value:
+            return 0
+        code = self._codes[dictionary].get(value)
+        if code is None:
+            code = self._codes[dictionary][value] = len(self._dictionaries[dictionary])
+            self._dictionaries[dictionary].append(value)
+            tmp_path = self._dictionary_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self._dictionaries, f)
+            os.replace(tmp_path, self._dictionary_path)
+        return code
+
+    def add_posts(self, posts: List[Dict]) -> int:
+        """Append posts not stored yet; returns how many were added
+
+        Each post needs 'id' and 'posted_at' (epoch seconds) and may carry
+        'content_type', 'topic' and 'content' (for hashtags).
+        """
+        with self._lock:
+            new = [post for post in posts if int(post['id']) not in self._rows]
+            if not new:
+                return 0
+            first_row = len(self._rows)
+            tag_rows, tags = [], []
+            for row, post in enumerate(new, first_row):
+                for tag in hashtags(post.get('content')):
+                    tag_rows.append(row)
+                    tags.append(self._encode('tag', tag))
+            columns = {
+                'tweet_id': [int(post['id']) for post in new],
+                'posted_at': [float(post['posted_at']) for post in new],
+                'refreshed_at': [0.0] * len(new),
+                'content_type': [self._encode('content_type', post.get('content_type')) for post in new],
+                'topic': [self._encode('topic', post.get('topic')) for post in new]
+            }
+            for column in METRIC_FIELDS.values():
+                columns[column] = [0] * len(new)
+            # Post columns first, so a crash can never leave tags pointing past
+            # the last complete row (a torn row is truncated by _repair)
+            for column in COLUMNS:
+                self._append(column, columns[column])
+            self._append('tag_row', tag_rows)
+            self._append('tag', tags)
+            for row, post in enumerate(new, first_row):
+                self._rows[int(post['id'])] = row
+            return len(new)
+
+    def update_metrics(self, public_metrics: Dict, refreshed_at: float = None):
+        """Overwrite metrics in place for {tweet_id: public_metrics}; unknown ids are ignored
+
+        A tweet mapped to None (deleted or unavailable) is only marked refreshed.
+        """
+        refreshed_at = time.time() if refreshed_at is None else refreshed_at
+        with self._lock:
+            rows = sorted((self._rows[int(tweet_id)], values) for tweet_id, values in public_metrics.items()
+                          if int(tweet_id) in self._rows)
+            if not rows:
+                return
+            for field, column in (*METRIC_FIELDS.items(), (None, 'refreshed_at')):
+                typecode = COLUMNS[column]
+                itemsize = array(typecode).itemsize
+                with open(self._path(column), 'r+b') as f:
+                    for row, values in rows:
+                        if field is None:
+                            value = refreshed_at
+                        elif values is None:
+                            continue
+                        else:
+                            value = int(values.get(field, 0) or 0)
+                        f.seek(row * itemsize)
+                        f.write(array(typecode, [value]).tobytes())
+
+    def due_for_refresh(self, window: float, interval: float, now: float = None) -> List[str]:
+        """Ids of posts younger than window seconds last refreshed over interval seconds ago"""
+        now = time.time() if now is None else now
+        with self._lock:
+            tweet_ids = self.read('tweet_id')
+            posted_at = self.read('posted_at')
+            refreshed_at = self.read('refreshed_at')
+        return [
+            str(tweet_id) for tweet_id, posted, refreshed in zip(tweet_ids, posted_at, refreshed_at)
+            if now - posted <= window and now - refreshed >= interval
+        ]
+
+    def engagement_by(self, dimension: str = 'content_type', days: float = 30, now: float = None) -> Dict[str, Dict]:
+        """Average engagement (likes + retweets + replies + quotes) and impressions per value of a dimension
+
+        Only posts from the last `days` days are included. Returns
+        {value: {'posts', 'avg_engagement', 'avg_impressions'}}, best first.
+        """
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {dimension}")
+        since = (time.time() if now is None else now) - days * 86400
+        with self._lock:
+            posted_at = self.read('posted_at')
+            engagement = [
+                sum(values) for values in zip(
+                    self.read('likes'), self.read('retweets'), self.read('replies'), self.read('quotes')
+                )
+            ]
+            impressions = self.read('impressions')
+            if dimension == 'hashtag':
+                pairs = zip(self.read('tag_row'), self.read('tag'))
+                names = self._dictionaries['tag']
+            else:
+                pairs = enumerate(self.read(dimension))
+                names = self._dictionaries[dimension]
+
+        totals = {}
+        for row, code in pairs:
+            if posted_at[row] < since:
+                continue
+            total = totals.setdefault(code, [0, 0, 0])
+            total[0] += 1
+            total[1] += engagement[row]
+            total[2] += impressions[row]
+        summary = {
+            names[code] or 'unknown': {
+                'posts': posts,
+                'avg_engagement': engaged / posts,
+                'avg_impressions': seen / posts
+            }
+            for code, (posts, engaged, seen) in totals.items()
+        }
+        return dict(sorted(summary.items(), key=lambda item: item[1]['avg_engagement'], reverse=True))
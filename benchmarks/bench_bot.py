@@ -0,0 +1,140 @@
+"""End-to-end TwitterBot benchmarks against the local fake services
+
+Run from the repository root:
+
+    python benchmarks/bench_bot.py --latency 0.05 --posts 50 --passes 3
+
+Nothing here talks to the real Twitter or OpenAI APIs; the bot runs in a
+temporary directory so its state and log files are thrown away afterwards.
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from local_services import FAKE_CREDENTIALS, REALISTIC_RATE_LIMITS, LocalServices, ServiceConfig
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def measure(name: str, operation: Callable[[], object], iterations: int) -> Dict:
+    """Run operation repeatedly and summarize its latency"""
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        begin = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - begin)
+    elapsed = time.perf_counter() - started
+    return {
+        'name': name,
+        'iterations': iterations,
+        'throughput': iterations / elapsed if elapsed else float('inf'),
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'mean_ms': statistics.fmean(latencies) * 1000 if latencies else 0.0
+    }
+
+
+def report(results: List[Dict]):
+    print(f"{'benchmark':32s} {'iters':>7s} {'ops/s':>10s} {'p50 ms':>9s} {'p99 ms':>9s}")
+    for result in results:
+        print(f"{result['name']:32s} {result['iterations']:7d} {result['throughput']:10.1f} "
+              f"{result['p50_ms']:9.2f} {result['p99_ms']:9.2f}")
+
+
+def make_bot(services: LocalServices, pool_size: int):
+    os.environ.update(FAKE_CREDENTIALS)
+    os.environ['CONTENT_POOL_SIZE'] = str(pool_size)
+    # Action pacing would dominate every measurement
+    os.environ['ACTION_RATES'] = 'like=1e9,retweet=1e9'
+    from twitter_bot import TwitterBot
+    bot = TwitterBot()
+    services.attach(bot)
+    # Engage with every candidate so each pass exercises the whole pipeline
+    bot.engagement_count = 10**9
+    return bot
+
+
+def run(args) -> List[Dict]:
+    config = ServiceConfig(
+        latency=args.latency,
+        latency_jitter=args.jitter,
+        error_rate=args.error_rate,
+        min_likes=0,
+        max_likes=args.max_likes,
+        seed=args.seed
+    )
+    if args.realistic_limits:
+        config.rate_limits = dict(REALISTIC_RATE_LIMITS)
+    results = []
+    with LocalServices(config) as services:
+        bot = make_bot(services, pool_size=0)
+        results.append(measure("post_tweet (sync generation)", bot.post_tweet, args.posts))
+
+        pooled = make_bot(services, pool_size=args.pool_size)
+        pooled.content_pool.start()
+        while len(pooled.content_pool) < min(args.pool_size, args.posts):
+            time.sleep(0.01)
+        results.append(measure("post_tweet (content pool)", pooled.post_tweet, min(args.pool_size, args.posts)))
+        pooled.content_pool.stop()
+
+        results.append(measure("engage_with_community", bot.engage_with_community, args.passes))
+        queued = len(bot.action_queue)
+        started = time.perf_counter()
+        bot.start_action_queue()
+        bot.action_queue.join()
+        bot.action_queue.stop()
+        elapsed = time.perf_counter() - started
+        print(f"action queue: sent {queued} actions in {elapsed:.2f}s")
+
+        entry = {'type': 'like_retweet', 'timestamp': '2024-01-01T00:00:00'}
+        counter = iter(range(10**12))
+        results.append(measure(
+            "record_engagement",
+            lambda: bot.record_engagement(str(next(counter)), dict(entry, timestamp=time.strftime('%Y-%m-%dT%H:%M:%S'))),
+            args.state_events
+        ))
+        results.append(measure("save_state (snapshot)", bot.save_state, 3))
+        results.append(measure("load_state", bot.load_state, 3))
+
+        print(f"requests served: {dict(sorted(services.state.request_counts.items()))}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.02, help="base latency of every fake request (s)")
+    parser.add_argument('--jitter', type=float, default=0.02, help="extra random latency up to this much (s)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument('--realistic-limits', action='store_true',
+                        help="enforce per-endpoint limits resembling the real API (429s with reset headers)")
+    parser.add_argument('--max-likes', type=int, default=2000, help="upper bound of like_count on search results")
+    parser.add_argument('--posts', type=int, default=20)
+    parser.add_argument('--pool-size', type=int, default=20)
+    parser.add_argument('--passes', type=int, default=3)
+    parser.add_argument('--state-events', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        report(run(args))
+
+
+if __name__ == "__main__":
+    main()
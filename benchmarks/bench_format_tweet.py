@@ -0,0 +1,63 @@
+"""Micro-benchmark: single-pass normalize_tweet vs. the previous format_tweet
+
+Run from the repository root:
+
+    python benchmarks/bench_format_tweet.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_templates import MockTemplateEngine
+from tweet_text import normalize_tweet, weighted_length
+
+TWEET_LENGTH = 240
+
+
+def legacy_format_tweet(content: str, tweet_length: int = TWEET_LENGTH) -> str:
+    """The multi-pass implementation format_tweet used before normalize_tweet"""
+    content = ' '.join(content.split())
+    content = re.sub(r'(?<!&)#', ' #', content)
+    if len(content) > tweet_length:
+        content = content[:tweet_length - 3] + "..."
+    return content
+
+
+def sample_tweets(count: int = 1000):
+    engine = MockTemplateEngine(
+        topics=["software development", "system design", "AI/ML engineering", "developer tools"],
+        primary_hashtags=["#TechTwitter", "#100DaysOfCode", "#DevCommunity"],
+        tech_hashtags=["#Python", "#JavaScript", "#Kubernetes"],
+        growth_hashtags=["#CareerGrowth", "#BuildInPublic", "#CodeMentor"],
+        engagement_hooks=["🤔 What's your take on this?", "🔄 RT if you agree", "👇 Drop your favorite tool below"],
+        time_based_content={
+            "morning": ["☀️ Morning motivation for devs"],
+            "afternoon": ["⚡ Quick productivity hack"],
+            "evening": ["📚 Evening learning session"]
+        }
+    )
+    tweets = engine.generate_batch(min(count, engine.combination_count()), seed=42)
+    # Add long inputs so the truncation path is exercised too
+    tweets += [tweet * 3 for tweet in tweets[:count // 10]]
+    return tweets
+
+
+def main():
+    tweets = sample_tweets()
+    runs = 20
+
+    for name, func in (("legacy format_tweet", legacy_format_tweet), ("normalize_tweet", normalize_tweet)):
+        seconds = min(timeit.repeat(lambda: [func(t, TWEET_LENGTH) for t in tweets], number=1, repeat=runs))
+        print(f"{name:22s} {seconds / len(tweets) * 1e6:8.2f} us/tweet")
+
+    over_limit = sum(weighted_length(legacy_format_tweet(t)) > TWEET_LENGTH for t in tweets)
+    print(f"legacy outputs over the weighted limit: {over_limit}/{len(tweets)}")
+    over_limit = sum(weighted_length(normalize_tweet(t, TWEET_LENGTH)) > TWEET_LENGTH for t in tweets)
+    print(f"normalize_tweet outputs over the weighted limit: {over_limit}/{len(tweets)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Cold-start benchmark: CLI subcommands vs. importing the full bot module
+
+Each case runs in a fresh interpreter. check-auth is run with empty
+credentials so it stops right before its single API call; what remains is
+the interpreter, import and setup cost the command pays on every run.
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py [--runs 10]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = (
+    ("python (baseline)", "pass"),
+    ("import twitter_bot", "import twitter_bot"),
+    ("cli --help", "import cli; cli.build_parser()"),
+    ("cli check-auth", "import cli; cli.main(['check-auth'])"),
+)
+
+
+def cold_start(code: str, env: dict) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    env = dict(os.environ, LOG_FILE='', TWITTER_BEARER_TOKEN='', TWITTER_API_KEY='', TWITTER_API_SECRET='',
+               TWITTER_ACCESS_TOKEN='', TWITTER_ACCESS_TOKEN_SECRET='')
+    for name, code in CASES:
+        cold_start(code, env)  # warm the OS file cache and bytecode
+        times = [cold_start(code, env) for _ in range(args.runs)]
+        print(f"{name:20s} median {statistics.median(times) * 1000:7.1f} ms   "
+              f"min {min(times) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
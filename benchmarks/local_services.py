@@ -0,0 +1,346 @@
+"""Local stand-ins for the Twitter v2 and OpenAI completion endpoints the bot uses
+
+Both fakes run in one ThreadingHTTPServer on 127.0.0.1 with configurable
+latency, error rate and rate limits, so TwitterBot can be driven at scale
+without touching the real APIs:
+
+    with LocalServices(latency=0.05) as services:
+        bot = TwitterBot()
+        services.attach(bot)
+        bot.post_tweet()
+"""
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+import openai
+from requests.adapters import HTTPAdapter
+
+TWITTER_HOST = "https://api.twitter.com"
+
+# Credentials that let tweepy sign requests and derive a user id offline
+FAKE_CREDENTIALS = {
+    'TWITTER_BEARER_TOKEN': 'local-bearer',
+    'TWITTER_API_KEY': 'local-key',
+    'TWITTER_API_SECRET': 'local-secret',
+    'TWITTER_ACCESS_TOKEN': '1000-local-token',
+    'TWITTER_ACCESS_TOKEN_SECRET': 'local-token-secret',
+    'OPENAI_API_KEY': 'sk-local'
+}
+
+
+# Completions draw their body from these, so generated tweets are not near-duplicates
+_COMPLETION_WORDS = (
+    "ship small measure often write tests review code refactor early profile first cache wisely "
+    "automate deploys document decisions pair program read logs trim scope name things well "
+    "delete dead code keep builds fast own your oncall learn the domain"
+).split()
+
+# Per-15-minute limits resembling the real v2 endpoints (user context)
+REALISTIC_RATE_LIMITS = {
+    'search': 180, 'like': 50, 'retweet': 50, 'create_tweet': 200,
+    'lookup': 900, 'completions': 3500
+}
+
+
+@dataclass
+class EndpointLimit:
+    """Fixed-window rate limit for one endpoint"""
+    limit: int
+    window: float = 900.0
+    remaining: int = None
+    reset_at: float = 0.0
+
+    def take(self, now: float) -> bool:
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.window
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+@dataclass
+class ServiceConfig:
+    """Behaviour of the fake endpoints"""
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    error_rate: float = 0.0
+    rate_limits: Dict[str, int] = field(default_factory=lambda: {
+        name: 10**9 for name in REALISTIC_RATE_LIMITS
+    })
+    rate_limit_window: float = 900.0
+    min_likes: int = 0
+    max_likes: int = 2000
+    seed: Optional[int] = None
+
+
+class _State:
+    def __init__(self, config: ServiceConfig):
+        self.config = config
+        self.lock = threading.Lock()
+        self.rng = random.Random(config.seed)
+        # Snowflake-style ids so since_id cursors look recent to the bot
+        self.next_id = (int(time.time() * 1000) - 1288834974657) << 22
+        self.tweets = {}
+        self.posted_texts = set()
+        self.likes = set()
+        self.retweets = set()
+        self.request_counts = {}
+        self.limits = {
+            name: EndpointLimit(limit, config.rate_limit_window)
+            for name, limit in config.rate_limits.items()
+        }
+
+    def new_id(self) -> str:
+        self.next_id += self.rng.randint(1, 1000)
+        return str(self.next_id)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self) -> _State:
+        return self.server.state
+
+    def _body(self) -> Dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}') if length else {}
+
+    def _send(self, status: int, payload: Dict, endpoint: str = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        limit = self.state.limits.get(endpoint)
+        if limit is not None:
+            self.send_header('x-rate-limit-limit', str(limit.limit))
+            self.send_header('x-rate-limit-remaining', str(max(limit.remaining or 0, 0)))
+            self.send_header('x-rate-limit-reset', str(int(limit.reset_at)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _admit(self, endpoint: str) -> bool:
+        """Apply latency, rate limits and injected errors; returns False if a response was sent"""
+        config = self.state.config
+        delay = config.latency + (self.state.rng.random() * config.latency_jitter if config.latency_jitter else 0)
+        if delay:
+            time.sleep(delay)
+        with self.state.lock:
+            self.state.request_counts[endpoint] = self.state.request_counts.get(endpoint, 0) + 1
+            limit = self.state.limits.get(endpoint)
+            allowed = limit is None or limit.take(time.time())
+            failed = self.state.rng.random() < config.error_rate
+        if not allowed:
+            self._send(429, {'title': 'Too Many Requests', 'status': 429}, endpoint)
+            return False
+        if failed:
+            self._send(503, {'title': 'Service Unavailable', 'status': 503}, endpoint)
+            return False
+        return True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path == '/2/tweets/search/recent':
+            self._search(params)
+        elif url.path == '/2/tweets':
+            self._lookup(params)
+        elif url.path == '/2/users/me':
+            self._send(200, {'data': {'id': '1000', 'name': 'Local Bot', 'username': 'local_bot'}})
+        else:
+            self._send(404, {'title': 'Not Found'})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        body = self._body()
+        parts = path.strip('/').split('/')
+        if path == '/2/tweets':
+            self._create_tweet(body)
+        elif len(parts) == 4 and parts[:2] == ['2', 'users'] and parts[3] in ('likes', 'retweets'):
+            self._engage(parts[3], body)
+        elif path.endswith('/completions'):
+            self._completions(body)
+        else:
+            self._send(404, {'title': 'Not Found'})
+
+    def _make_tweet(self, text: str) -> Dict:
+        rng = self.state.rng
+        config = self.state.config
+        likes = rng.randint(config.min_likes, config.max_likes)
+        tweet_id = self.state.new_id()
+        tweet = {
+            'id': tweet_id,
+            'text': text,
+            'edit_history_tweet_ids': [tweet_id],
+            'author_id': str(rng.randint(1, 10**9)),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime()),
+            'public_metrics': {
+                'like_count': likes,
+                'retweet_count': likes // rng.randint(2, 10),
+                'reply_count': likes // rng.randint(5, 40),
+                'quote_count': likes // rng.randint(10, 80),
+                'impression_count': likes * rng.randint(20, 200)
+            }
+        }
+        self.state.tweets[tweet['id']] = tweet
+        return tweet
+
+    def _search(self, params: Dict):
+        if not self._admit('search'):
+            return
+        # Every returned tweet mentions one of the OR-ed alternatives of the query
+        query = params.get('query', '')
+        core = ' '.join(term for term in query.split() if not term.startswith(('-', 'lang:')))
+        alternatives = [
+            alternative.replace('(', '').replace(')', '').replace('"', '').strip()
+            for alternative in core.split(' OR ')
+        ] or ['tech']
+        max_results = max(10, min(100, int(params.get('max_results', 10))))
+        with self.state.lock:
+            count = self.state.rng.randint(0, max_results)
+            tweets = [
+                self._make_tweet(f"Thoughts on {self.state.rng.choice(alternatives)} today")
+                for _ in range(count)
+            ]
+            has_more = self.state.rng.random() < 0.5
+        tweets.sort(key=lambda tweet: int(tweet['id']), reverse=True)
+        fields = set(params.get('tweet.fields', '').split(','))
+        data = [
+            {key: value for key, value in tweet.items() if key in ('id', 'text', 'edit_history_tweet_ids') or key in fields}
+            for tweet in tweets
+        ]
+        meta = {'result_count': len(data)}
+        if data:
+            meta['newest_id'] = data[0]['id']
+            meta['oldest_id'] = data[-1]['id']
+            if has_more:
+                meta['next_token'] = f"page-{data[-1]['id']}"
+        payload = {'meta': meta}
+        if data:
+            payload['data'] = data
+        self._send(200, payload, 'search')
+
+    def _lookup(self, params: Dict):
+        if not self._admit('lookup'):
+            return
+        ids = [tweet_id for tweet_id in params.get('ids', '').split(',') if tweet_id]
+        if len(ids) > 100:
+            self._send(400, {'title': 'Invalid Request', 'detail': 'ids must contain at most 100 items'})
+            return
+        with self.state.lock:
+            data = [self.state.tweets[tweet_id] for tweet_id in ids if tweet_id in self.state.tweets]
+        self._send(200, {'data': data} if data else {}, 'lookup')
+
+    def _create_tweet(self, body: Dict):
+        if not self._admit('create_tweet'):
+            return
+        text = body.get('text', '')
+        with self.state.lock:
+            if text in self.state.posted_texts:
+                self._send(403, {'title': 'Forbidden', 'detail': 'You are not allowed to create a Tweet with duplicate content.'},
+                           'create_tweet')
+                return
+            self.state.posted_texts.add(text)
+            tweet = self._make_tweet(text)
+        self._send(201, {'data': {'id': tweet['id'], 'text': text}}, 'create_tweet')
+
+    def _engage(self, action: str, body: Dict):
+        endpoint = 'like' if action == 'likes' else 'retweet'
+        if not self._admit(endpoint):
+            return
+        with self.state.lock:
+            (self.state.likes if action == 'likes' else self.state.retweets).add(body.get('tweet_id'))
+        key = 'liked' if action == 'likes' else 'retweeted'
+        self._send(200, {'data': {key: True}}, endpoint)
+
+    def _completions(self, body: Dict):
+        if not self._admit('completions'):
+            return
+        prompt = body.get('prompt', '')
+        topic = prompt.split(' about ', 1)[1].split('.', 1)[0] if ' about ' in prompt else 'tech'
+        with self.state.lock:
+            choices = [
+                {
+                    'text': f"\n\nHot take on {topic}: "
+                            f"{' '.join(self.state.rng.sample(_COMPLETION_WORDS, 8))} #DevCommunity",
+                    'index': i,
+                    'finish_reason': 'stop'
+                }
+                for i in range(int(body.get('n', 1)))
+            ]
+        self._send(200, {'id': 'cmpl-local', 'object': 'text_completion', 'choices': choices}, 'completions')
+
+
+class _LocalAdapter(HTTPAdapter):
+    """Transport adapter that sends api.twitter.com requests to the local server"""
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        request.url = self.base_url + request.url[len(TWITTER_HOST):]
+        return super().send(request, **kwargs)
+
+
+class LocalServices:
+    """Run the fake Twitter/OpenAI server in a background thread"""
+
+    def __init__(self, config: ServiceConfig = None, **overrides):
+        self.config = config or ServiceConfig(**overrides)
+        self.server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def state(self) -> _State:
+        return self.server.state
+
+    def start(self) -> 'LocalServices':
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.state = _State(self.config)
+        self._thread = threading.Thread(target=self.server.serve_forever, name='local-services', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self) -> 'LocalServices':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def attach_client(self, client):
+        """Route a tweepy.Client's requests to the local server"""
+        client.session.mount(TWITTER_HOST, _LocalAdapter(self.url))
+
+    def attach_openai(self):
+        """Point the openai module at the local completions endpoint"""
+        openai.api_base = self.url + '/v1'
+        openai.api_key = FAKE_CREDENTIALS['OPENAI_API_KEY']
+
+    def attach(self, bot):
+        """Route all of a TwitterBot's API traffic to the local server"""
+        self.attach_client(bot.client)
+        self.attach_openai()
@@ -0,0 +1,163 @@
+"""Command-line entry point for the bot
+
+Only the standard library is imported up front. tweepy, openai and the bot
+itself are imported inside the subcommands that need them, so short
+commands such as check-auth start without paying for the full bot.
+"""
+import os
+import sys
+import argparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def load_env():
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def cmd_run(args) -> int:
+    """Run the scheduler until interrupted"""
+    if args.accounts or os.getenv('ACCOUNTS_FILE'):
+        from multi_account import main
+        main(args.accounts)
+    else:
+        from twitter_bot import main
+        main(args.worker)
+    return 0
+
+
+def cmd_post_once(args) -> int:
+    """Post a single tweet and exit"""
+    from twitter_bot import TwitterBot
+    bot = TwitterBot(state_path=args.state)
+    try:
+        success = bot.post_tweet()
+    finally:
+        bot.save_state()
+    if success:
+        print("Tweet posted successfully")
+    else:
+        print("Failed to post tweet. Check the logs for details.")
+    return 0 if success else 1
+
+
+def cmd_engage_once(args) -> int:
+    """Run one community engagement pass and exit"""
+    from twitter_bot import TwitterBot
+    bot = TwitterBot(state_path=args.state)
+    bot.start_action_queue()
+    try:
+        bot.engage_with_community()
+        if len(bot.action_queue):
+            logger.info("Sending %d queued actions at the configured pace...", len(bot.action_queue))
+        bot.action_queue.join()
+    finally:
+        bot.action_queue.stop()
+        bot.save_state()
+    return 0
+
+
+def cmd_check_auth(args) -> int:
+    """Verify Twitter (and optionally OpenAI) credentials"""
+    import tweepy
+    from clients import missing_credentials, twitter_client
+
+    missing = missing_credentials()
+    if missing:
+        logger.error("Missing credentials: %s", ', '.join(missing))
+        return 1
+
+    try:
+        user = twitter_client(wait_on_rate_limit=False).get_me()
+        logger.info("Authenticated with Twitter as @%s", user.data.username)
+    except tweepy.errors.Unauthorized as e:
+        logger.error("Twitter Authentication Error: %s", e)
+        logger.error("Please check if your Twitter API credentials are correct and have the right permissions")
+        return 1
+    except Exception as e:
+        logger.error("Error connecting to Twitter API: %s", e)
+        return 1
+
+    if args.openai:
+        import openai
+        try:
+            openai.Model.list(api_key=os.getenv('OPENAI_API_KEY'))
+            logger.info("Authenticated with OpenAI")
+        except Exception as e:
+            logger.error("Error connecting to OpenAI API: %s", e)
+            return 1
+    return 0
+
+
+def cmd_dry_run(args) -> int:
+    """Generate and format tweets without posting or saving anything"""
+    from twitter_bot import TwitterBot
+    from tweet_text import weighted_length
+    bot = TwitterBot(state_path=args.state)
+    for _ in range(args.count):
+        if args.mock:
+            content = bot.generate_mock_content()
+        else:
+            draft = bot.generate_content(read_only=True)
+            content = draft and draft['content']
+        if not content:
+            continue
+        formatted = bot.format_tweet(content)
+        match = bot.post_index.query(formatted)
+        note = f" - near-duplicate of {match[0]}" if match else ""
+        print(f"[{weighted_length(formatted)}/{bot.tweet_length}{note}]\n{formatted}\n")
+    return 0
+
+
+def cmd_stats(args) -> int:
+    """Show average engagement of recent posts by content type, topic or hashtag"""
+    from analytics import PerformanceStore
+    store = PerformanceStore(os.path.splitext(args.state)[0] + '.analytics')
+    summary = store.engagement_by(args.by, days=args.days)
+    print(f"{args.by:32s} {'posts':>6s} {'avg engagement':>15s} {'avg impressions':>16s}")
+    for value, row in summary.items():
+        print(f"{value:32s} {row['posts']:6d} {row['avg_engagement']:15.1f} {row['avg_impressions']:16.1f}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='twitter-bot', description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help=cmd_run.__doc__)
+    run.add_argument('--accounts', metavar='FILE', help="run every account in a multi-account JSON file")
+    run.add_argument('--worker', metavar='ID', help="stable shard worker name, required when SHARD_DB is set "
+                                                    "(default: SHARD_WORKER or DYNO)")
+    run.set_defaults(func=cmd_run)
+
+    for name, func in (('post-once', cmd_post_once), ('engage-once', cmd_engage_once), ('dry-run', cmd_dry_run),
+                       ('stats', cmd_stats)):
+        command = commands.add_parser(name, help=func.__doc__)
+        command.add_argument('--state', default='bot_state.json', help="state snapshot path (default: bot_state.json)")
+        command.set_defaults(func=func)
+        if name == 'dry-run':
+            command.add_argument('-n', '--count', type=int, default=3, help="number of tweets to generate")
+            command.add_argument('--mock', action='store_true', help="use mock templates instead of OpenAI")
+        if name == 'stats':
+            command.add_argument('--by', choices=('content_type', 'topic', 'hashtag'), default='content_type')
+            command.add_argument('--days', type=float, default=30, help="only posts from the last DAYS days")
+
+    check_auth = commands.add_parser('check-auth', help=cmd_check_auth.__doc__)
+    check_auth.add_argument('--openai', action='store_true', help="also verify the OpenAI API key")
+    check_auth.set_defaults(func=cmd_check_auth)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    # Settings such as LOG_*, ACCOUNTS_FILE and SHARD_* are read before the bot loads .env
+    load_env()
+    from log_setup import setup_logging
+    setup_logging()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
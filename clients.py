@@ -0,0 +1,56 @@
+import os
+from typing import Callable
+
+import tweepy
+
+from rate_limits import RateLimitTracker, endpoint_name
+
+# tweepy.Client argument -> environment variable holding it
+TWITTER_CREDENTIALS = {
+    'bearer_token': 'TWITTER_BEARER_TOKEN',
+    'consumer_key': 'TWITTER_API_KEY',
+    'consumer_secret': 'TWITTER_API_SECRET',
+    'access_token': 'TWITTER_ACCESS_TOKEN',
+    'access_token_secret': 'TWITTER_ACCESS_TOKEN_SECRET'
+}
+
+
+def missing_credentials(getenv: Callable = os.getenv) -> list:
+    """Names of Twitter credential settings that are not set"""
+    return [name for name in TWITTER_CREDENTIALS.values() if not getenv(name)]
+
+
+class TrackedClient(tweepy.Client):
+    """tweepy Client that feeds every response's rate-limit headers to a tracker"""
+
+    def __init__(self, *args, rate_limits: RateLimitTracker = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rate_limits = rate_limits or RateLimitTracker()
+
+    def request(self, method, route, params=None, json=None, user_auth=False):
+        endpoint = endpoint_name(method, route)
+        try:
+            response = super().request(method, route, params=params, json=json, user_auth=user_auth)
+        except tweepy.errors.HTTPException as e:
+            self.rate_limits.update(endpoint, e.response.headers)
+            raise
+        self.rate_limits.update(endpoint, response.headers)
+        return response
+
+
+def twitter_client(getenv: Callable = os.getenv, session=None, wait_on_rate_limit: bool = False,
+                   rate_limits: RateLimitTracker = None) -> TrackedClient:
+    """Build a v2 client from the TWITTER_* credential settings
+
+    Rate limits are not waited out by default: a 429 raises TooManyRequests
+    and the budgets in client.rate_limits tell callers what to defer.
+    """
+    client = TrackedClient(
+        **{arg: getenv(name) for arg, name in TWITTER_CREDENTIALS.items()},
+        wait_on_rate_limit=wait_on_rate_limit,
+        rate_limits=rate_limits
+    )
+    if session is not None:
+        # Reuse a shared keep-alive connection pool
+        client.session = session
+    return client
@@ -0,0 +1,105 @@
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ContentPool:
+    """Buffer of ready-to-post tweets refilled by a background thread
+
+    `produce` returns a batch of already formatted and validated drafts
+    (dicts with at least a 'content' key). The worker keeps the pool topped
+    up to `target_size` so posting only has to dequeue. A batch usually
+    holds variants of one prompt, so `get` avoids handing out two drafts
+    of the same (content_type, topic) in a row.
+    """
+
+    def __init__(self, produce: Callable[[], List[Dict]], target_size: int = 6,
+                 retry_interval: float = 60):
+        self.produce = produce
+        self.target_size = target_size
+        self.retry_interval = retry_interval
+        self._drafts = deque()
+        self._last_prompt = None
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def __len__(self) -> int:
+        return len(self._drafts)
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self):
+        """Start the background refill thread"""
+        if self._running or self.target_size <= 0:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='content-pool', daemon=True)
+        self._thread.start()
+        logger.info(f"Content pool started (target size {self.target_size})")
+
+    def stop(self):
+        """Stop the background refill thread"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    @staticmethod
+    def _prompt(draft: Dict):
+        return draft.get('content_type'), draft.get('topic')
+
+    def get(self) -> Optional[Dict]:
+        """Take the oldest ready draft whose prompt differs from the last one taken
+
+        Falls back to the oldest draft when every ready draft shares that
+        prompt; returns None if the pool is empty.
+        """
+        with self._condition:
+            if not self._drafts:
+                return None
+            index = next((i for i, draft in enumerate(self._drafts) if self._prompt(draft) != self._last_prompt), 0)
+            draft = self._drafts[index]
+            del self._drafts[index]
+            self._last_prompt = self._prompt(draft)
+            self._condition.notify_all()
+        return draft
+
+    def drain(self) -> List[Dict]:
+        """Take every ready draft out of the pool"""
+        with self._condition:
+            drafts = list(self._drafts)
+            self._drafts.clear()
+            self._condition.notify_all()
+        return drafts
+
+    def fill_once(self) -> int:
+        """Produce one batch into the pool; returns the number of drafts added"""
+        drafts = self.produce()
+        with self._condition:
+            self._drafts.extend(drafts)
+        return len(drafts)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and len(self._drafts) >= self.target_size:
+                    self._condition.wait()
+                if not self._running:
+                    return
+            try:
+                added = self.fill_once()
+            except Exception as e:
+                logger.error(f"Error refilling content pool: {str(e)}")
+                added = 0
+            if not added:
+                # Back off instead of spinning while generation is failing
+                with self._condition:
+                    self._condition.wait(self.retry_interval)
@@ -0,0 +1,126 @@
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    prompt_key TEXT NOT NULL,
+    content_type TEXT,
+    topic TEXT,
+    text TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS generations_key ON generations (prompt_key, created);
+CREATE INDEX IF NOT EXISTS generations_accessed ON generations (accessed);
+"""
+
+
+def prompt_key(*parts) -> str:
+    """Stable cache key for the parameters that produced a generation"""
+    return hashlib.sha1('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:16]
+
+
+class GenerationCache:
+    """On-disk store of unused OpenAI generations
+
+    Entries are consumed when taken, so a generation is served at most
+    once. Entries older than `ttl` seconds expire; beyond `max_entries`
+    the prompt keys that were requested least recently are evicted first.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1000, ttl: float = 30 * 86400):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE so a take is atomic even across processes sharing the file
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                yield
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+            self._db.execute('COMMIT')
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM generations').fetchone()[0]
+
+    def count(self, key: str) -> int:
+        with self._lock:
+            return self._db.execute(
+                'SELECT COUNT(*) FROM generations WHERE prompt_key = ? AND created > ?',
+                (key, time.time() - self.ttl)
+            ).fetchone()[0]
+
+    def put(self, key: str, texts: List[str], content_type: str = None, topic: str = None):
+        """Store unused generations for a prompt key"""
+        texts = [text for text in texts if text]
+        if not texts or self.max_entries <= 0:
+            return
+        now = time.time()
+        with self._transaction():
+            self._db.executemany(
+                'INSERT INTO generations (prompt_key, content_type, topic, text, created, accessed) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(key, content_type, topic, text, now, now) for text in texts]
+            )
+            self._evict(now)
+
+    def take(self, key: str = None, n: int = 1) -> List[Dict]:
+        """Remove and return up to n unexpired generations, oldest first
+
+        Each is a dict with 'content', 'content_type' and 'topic'. With no
+        key, generations for any prompt are served.
+        """
+        now = time.time()
+        with self._transaction():
+            if key is None:
+                rows = self._db.execute(
+                    'SELECT id, text, content_type, topic FROM generations WHERE created > ? ORDER BY created LIMIT ?',
+                    (now - self.ttl, n)
+                ).fetchall()
+            else:
+                self._db.execute('UPDATE generations SET accessed = ? WHERE prompt_key = ?', (now, key))
+                rows = self._db.execute(
+                    'SELECT id, text, content_type, topic FROM generations WHERE prompt_key = ? AND created > ? ORDER BY created LIMIT ?',
+                    (key, now - self.ttl, n)
+                ).fetchall()
+            self._db.executemany('DELETE FROM generations WHERE id = ?', [(row[0],) for row in rows])
+        return [{'content': text, 'content_type': content_type, 'topic': topic}
+                for _, text, content_type, topic in rows]
+
+    def evict(self):
+        with self._transaction():
+            self._evict(time.time())
+
+    def _evict(self, now: float):
+        expired = self._db.execute('DELETE FROM generations WHERE created <= ?', (now - self.ttl,)).rowcount
+        excess = self._db.execute('SELECT COUNT(*) FROM generations').fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                'DELETE FROM generations WHERE id IN '
+                '(SELECT id FROM generations ORDER BY accessed, created LIMIT ?)',
+                (excess,)
+            )
+        if expired or excess > 0:
+            logger.debug("Evicted %d expired and %d excess cached generations", expired, max(excess, 0))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,100 @@
+import os
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from typing import Optional
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener = None
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves all formatting to the listener thread
+
+    The stock QueueHandler formats the message in the calling thread; here
+    a log call costs a queue put and the record is rendered in the
+    background.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Render records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _file_handler(log_file: str, max_bytes: int, backup_count: int, rotate_when: Optional[str]) -> logging.Handler:
+    if rotate_when:
+        return logging.handlers.TimedRotatingFileHandler(
+            log_file, when=rotate_when, backupCount=backup_count, encoding='utf-8'
+        )
+    return logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+    )
+
+
+def setup_logging(log_file: str = None, level: str = None, json_format: bool = None,
+                  max_bytes: int = None, backup_count: int = None, rotate_when: str = None):
+    """Route root logging through a queue to rotating file and console handlers
+
+    Arguments default to the LOG_FILE, LOG_LEVEL, LOG_FORMAT (text|json),
+    LOG_MAX_BYTES, LOG_BACKUP_COUNT and LOG_ROTATE_WHEN environment
+    variables. Calling it again replaces the previous setup.
+    """
+    global _listener
+
+    log_file = log_file or os.getenv('LOG_FILE', 'twitter_bot.log')
+    level = level or os.getenv('LOG_LEVEL', 'INFO')
+    if json_format is None:
+        json_format = os.getenv('LOG_FORMAT', 'text').lower() == 'json'
+    max_bytes = max_bytes if max_bytes is not None else int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+    backup_count = backup_count if backup_count is not None else int(os.getenv('LOG_BACKUP_COUNT', 5))
+    rotate_when = rotate_when or os.getenv('LOG_ROTATE_WHEN') or None
+
+    formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(_file_handler(log_file, max_bytes, backup_count, rotate_when))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    if _listener is not None:
+        _listener.stop()
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
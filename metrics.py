@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import bisect
+import logging
+import functools
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from local work up to slow API calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Tuple, extra: Tuple = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+class Counter:
+    """Monotonically increasing count"""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    """Value that can go up and down"""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = float(value)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation"""
+        with self._lock:
+            target = q * self.count
+            seen = 0
+            for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+                seen += count
+                if seen >= target and count:
+                    return bound
+        return 0.0
+
+
+class MetricsRegistry:
+    """Named, labelled counters, gauges and histograms
+
+    Metrics are created on first use and then looked up by a dict hit, so
+    instrumenting a hot path costs a lock and a few increments.
+    """
+
+    def __init__(self, namespace: str = 'twitterbot'):
+        self.namespace = namespace
+        self._metrics = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind: str, name: str, factory: Callable, help_text: str, labels: Dict):
+        key = (kind, name, _label_key(labels))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = factory()
+                    if help_text:
+                        self._help[name] = help_text
+        return metric
+
+    def counter(self, name: str, help_text: str = '', **labels) -> Counter:
+        return self._get('counter', name, Counter, help_text, labels)
+
+    def gauge(self, name: str, help_text: str = '', **labels) -> Gauge:
+        return self._get('gauge', name, Gauge, help_text, labels)
+
+    def histogram(self, name: str, help_text: str = '', buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+                  **labels) -> Histogram:
+        return self._get('histogram', name, lambda: Histogram(buckets), help_text, labels)
+
+    @contextmanager
+    def timed(self, name: str, **labels):
+        """Record the duration of a block in <name>_seconds and count it in <name>_total by outcome"""
+        started = time.perf_counter()
+        outcome = 'ok'
+        try:
+            yield
+        except BaseException:
+            outcome = 'error'
+            raise
+        finally:
+            self.histogram(f"{name}_seconds", **labels).observe(time.perf_counter() - started)
+            self.counter(f"{name}_total", outcome=outcome, **labels).inc()
+
+    def instrument(self, func: Callable, name: str, **labels) -> Callable:
+        """Wrap func so every call is timed under name"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.timed(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        typed = set()
+        for (kind, name, labels), metric in sorted(list(self._metrics.items()), key=lambda item: item[0][1:]):
+            full_name = f"{self.namespace}_{name}"
+            if full_name not in typed:
+                if name in self._help:
+                    lines.append(f"# HELP {full_name} {self._help[name]}")
+                lines.append(f"# TYPE {full_name} {kind}")
+                typed.add(full_name)
+            if kind == 'histogram':
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float('inf'),), metric.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f"{full_name}_bucket{_format_labels(labels, (('le', le),))} {cumulative}")
+                lines.append(f"{full_name}_sum{_format_labels(labels)} {metric.sum}")
+                lines.append(f"{full_name}_count{_format_labels(labels)} {metric.count}")
+            else:
+                lines.append(f"{full_name}{_format_labels(labels)} {metric.value}")
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> Dict:
+        """Summarize all metrics as a JSON-serializable dict"""
+        result = {}
+        for (kind, name, labels), metric in list(self._metrics.items()):
+            key = name + _format_labels(labels)
+            if kind == 'histogram':
+                result[key] = {
+                    'count': metric.count,
+                    'sum': metric.sum,
+                    'p50': metric.quantile(0.5),
+                    'p99': metric.quantile(0.99)
+                }
+            else:
+                result[key] = metric.value
+        return result
+
+    def write_snapshot(self, path: str):
+        """Atomically write snapshot() to a JSON file"""
+        try:
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'timestamp': time.time(), 'metrics': self.snapshot()}, f, indent=2)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error writing metrics snapshot: {str(e)}")
+
+    def serve(self, port: int, host: str = '0.0.0.0') -> ThreadingHTTPServer:
+        """Expose /metrics over HTTP from a daemon thread"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+        logger.info(f"Serving metrics on port {port}")
+        return server
+
+
+# Process-wide registry used by the bot
+metrics = MetricsRegistry()
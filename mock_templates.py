@@ -0,0 +1,137 @@
+import bisect
+import random
+from datetime import datetime
+from string import Formatter
+from typing import Dict, List
+
+# Mock tweet templates; fields are filled from the bot's topic, hashtag and hook lists
+MOCK_TEMPLATES = [
+    "{time_intro}\n\n💡 {topic} pro tip:\n• Start small\n• Build consistently\n• Share progress\n\n{engagement_hook}\n\n{hashtags}",
+    "🔥 Want to excel in {topic}?\n\n3 game-changing practices:\n1️⃣ Code daily\n2️⃣ Read documentation\n3️⃣ Build projects\n\n{engagement_hook}\n\n{hashtags}",
+    "🚀 {topic} wisdom:\n\nWhat I wish I knew earlier:\n• Test early\n• Document well\n• Seek feedback\n\n{engagement_hook}\n\n{hashtags}",
+    "{time_intro}\n\nMy top 3 tools for {topic}:\n🛠️ [Tool 1]\n⚡ [Tool 2]\n🔧 [Tool 3]\n\n{engagement_hook}\n\n{hashtags}",
+    "💎 {topic} golden rule:\n\nDon't just write code.\nWrite code that tells a story.\n\n{engagement_hook}\n\n{hashtags}",
+    "📈 Boost your {topic} skills:\n\nKey focus areas:\n• Core concepts\n• Best practices\n• Real projects\n\n{engagement_hook}\n\n{hashtags}",
+    "⚡ Quick {topic} tip:\n\nAlways remember:\nCode for humans first,\ncomputers second.\n\n{engagement_hook}\n\n{hashtags}",
+    "🎯 {topic} challenge:\n\nBuild something useful today.\nShare your progress.\nSupport others.\n\n{engagement_hook}\n\n{hashtags}"
+]
+
+# Fields every template needs; hashtags expands into one tag from each group
+_HASHTAG_FIELDS = ('primary_tag', 'tech_tag', 'growth_tag')
+
+
+class MockTemplateEngine:
+    """Templates, hashtag groups and hooks compiled once for cheap mock tweets
+
+    Each template is parsed into literal chunks and field names up front, so
+    rendering is a single join. Every distinct tweet corresponds to one
+    integer in a mixed-radix combination space, which lets a batch draw
+    unique combinations without generating and discarding duplicates.
+    """
+
+    def __init__(self, topics: List[str], primary_hashtags: List[str], tech_hashtags: List[str],
+                 growth_hashtags: List[str], engagement_hooks: List[str],
+                 time_based_content: Dict[str, List[str]], templates: List[str] = None):
+        self.choices = {
+            'topic': list(topics),
+            'primary_tag': list(primary_hashtags),
+            'tech_tag': list(tech_hashtags),
+            'growth_tag': list(growth_hashtags),
+            'engagement_hook': list(engagement_hooks)
+        }
+        self.time_based_content = {period: list(intros) for period, intros in time_based_content.items()}
+        self.templates = [self._compile(template) for template in (templates or MOCK_TEMPLATES)]
+
+    @staticmethod
+    def _compile(template: str):
+        parts = []
+        fields = []
+        for literal, field, _, _ in Formatter().parse(template):
+            if field == 'hashtags':
+                parts.append((literal, 'primary_tag'))
+                parts.append((' ', 'tech_tag'))
+                parts.append((' ', 'growth_tag'))
+                fields.extend(_HASHTAG_FIELDS)
+            else:
+                parts.append((literal, field))
+                if field and field not in fields:
+                    fields.append(field)
+        return parts, fields
+
+    @staticmethod
+    def period(hour: int) -> str:
+        """Map an hour of the day to a time-based content bucket"""
+        if 5 <= hour < 12:
+            return "morning"
+        elif 12 <= hour < 17:
+            return "afternoon"
+        return "evening"
+
+    def _field_choices(self, field: str, period: str = None, topic: str = None) -> List[str]:
+        if field == 'time_intro':
+            # Without a period the intro is left out
+            return self.time_based_content[period] if period else ['']
+        if field == 'topic' and topic is not None:
+            return [topic]
+        return self.choices[field]
+
+    @staticmethod
+    def _render(parts, values: Dict[str, str]) -> str:
+        return ''.join(literal + (values[field] if field else '') for literal, field in parts).strip()
+
+    def render(self, rng: random.Random = None, topic: str = None, hour: int = None) -> str:
+        """Render one random mock tweet"""
+        rng = rng or random
+        period = self.period(datetime.now().hour if hour is None else hour)
+        parts, fields = rng.choice(self.templates)
+        values = {field: rng.choice(self._field_choices(field, period, topic)) for field in fields}
+        return self._render(parts, values)
+
+    def combination_count(self, hour: int = None, topic: str = None) -> int:
+        """Number of distinct tweets the engine can produce for a time of day"""
+        return sum(self._template_sizes(self.period(datetime.now().hour if hour is None else hour), topic))
+
+    def _template_sizes(self, period: str = None, topic: str = None) -> List[int]:
+        sizes = []
+        for _, fields in self.templates:
+            size = 1
+            for field in fields:
+                size *= len(self._field_choices(field, period, topic))
+            sizes.append(size)
+        return sizes
+
+    def generate_batch(self, n: int, seed=None, hour: int = None, topic: str = None,
+                       timeless: bool = False) -> List[str]:
+        """Render n distinct mock tweets in one pass
+
+        timeless leaves out the time-of-day intro, for tweets posted later
+        than they are rendered. Raises ValueError if n exceeds the number of
+        distinct combinations.
+        """
+        rng = random.Random(seed)
+        period = None if timeless else self.period(datetime.now().hour if hour is None else hour)
+        sizes = self._template_sizes(period, topic)
+        offsets = []
+        total = 0
+        for size in sizes:
+            offsets.append(total)
+            total += size
+        if n > total:
+            raise ValueError(f"Requested {n} mock tweets but only {total} distinct combinations exist")
+
+        field_choices = [
+            [self._field_choices(field, period, topic) for field in fields]
+            for _, fields in self.templates
+        ]
+
+        batch = []
+        for index in rng.sample(range(total), n):
+            template_index = bisect.bisect_right(offsets, index) - 1
+            remainder = index - offsets[template_index]
+            parts, fields = self.templates[template_index]
+            values = {}
+            for field, choices in zip(fields, field_choices[template_index]):
+                remainder, position = divmod(remainder, len(choices))
+                values[field] = choices[position]
+            batch.append(self._render(parts, values))
+        return batch
@@ -0,0 +1,117 @@
+import os
+import sys
+import json
+import logging
+from typing import Dict, List
+
+import openai
+import requests
+from requests.adapters import HTTPAdapter
+
+from twitter_bot import TwitterBot, start_metrics_export
+from scheduler import EventScheduler
+from log_setup import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def load_accounts(path: str) -> List[Dict[str, str]]:
+    """Load account settings from a JSON file
+
+    The file holds a list of accounts, or {"defaults": {...}, "accounts": [...]}
+    where defaults apply to every account. Each account needs a unique
+    "name" plus the same keys the single-account bot reads from .env.
+    """
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {'accounts': data}
+    defaults = data.get('defaults', {})
+    accounts = []
+    for account in data['accounts']:
+        settings = {key: str(value) for key, value in {**defaults, **account}.items()}
+        if 'name' not in settings:
+            raise ValueError("Every account needs a name")
+        accounts.append(settings)
+    names = [account['name'] for account in accounts]
+    if len(names) != len(set(names)):
+        raise ValueError("Account names must be unique")
+    return accounts
+
+
+class MultiAccountRunner:
+    """Host many TwitterBot accounts in one process
+
+    All bots share one keep-alive HTTP connection pool (for both tweepy and
+    openai), the mock template engine and one scheduler; accounts using the
+    same OpenAI key share its circuit breaker. Each account keeps its own
+    credentials, state files and tweepy client, so rate-limit budgets stay
+    per account.
+    """
+
+    def __init__(self, accounts: List[Dict[str, str]], state_dir: str = 'state',
+                 pool_maxsize: int = 32, max_workers: int = 8):
+        os.makedirs(state_dir, exist_ok=True)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        openai.requestssession = self.session
+
+        self.scheduler = EventScheduler(
+            state_path=os.path.join(state_dir, 'scheduler_state.json'),
+            max_workers=max_workers
+        )
+        self.bots = {}
+        # Accounts can bring their own OpenAI key; one bad key must not
+        # send the accounts with working keys to mock content
+        breakers = {}
+        shared_engine = None
+        for settings in accounts:
+            name = settings['name']
+            api_key = settings.get('OPENAI_API_KEY', os.getenv('OPENAI_API_KEY'))
+            bot = TwitterBot(
+                settings=settings,
+                state_path=os.path.join(state_dir, f"{name}.json"),
+                session=self.session,
+                openai_breaker=breakers.get(api_key),
+                mock_engine=shared_engine
+            )
+            breakers.setdefault(api_key, bot.openai_breaker)
+            shared_engine = shared_engine or bot.mock_engine
+            bot.schedule(self.scheduler, prefix=f"{name}:")
+            self.bots[name] = bot
+        logger.info(f"Loaded {len(self.bots)} accounts")
+
+    def run_forever(self):
+        """Start content pools and run every account's jobs until interrupted"""
+        for bot in self.bots.values():
+            bot.start_content_pool()
+            bot.start_action_queue()
+        start_metrics_export(self.scheduler)
+        self.scheduler.stop_on_signals()
+        try:
+            self.scheduler.run_forever()
+        finally:
+            self.scheduler.stop()
+            for bot in self.bots.values():
+                bot.stop_content_pool()
+                bot.action_queue.stop()
+                bot.save_state()
+
+
+def main(path: str = None):
+    path = path or os.getenv('ACCOUNTS_FILE', 'accounts.json')
+    runner = MultiAccountRunner(
+        load_accounts(path),
+        state_dir=os.getenv('STATE_DIR', 'state'),
+        pool_maxsize=int(os.getenv('HTTP_POOL_MAXSIZE', 32)),
+        max_workers=int(os.getenv('SCHEDULER_WORKERS', 8))
+    )
+    logger.info("Multi-account bot started. Waiting for scheduled times...")
+    runner.run_forever()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,105 @@
+import re
+import time
+import threading
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+
+from metrics import metrics
+
+# (method, route pattern) -> endpoint name, matching the names used with TwitterBot.call_twitter
+ENDPOINTS = (
+    ('GET', re.compile(r'^/2/tweets/search/recent$'), 'search_recent_tweets'),
+    ('GET', re.compile(r'^/2/tweets$'), 'get_tweets'),
+    ('POST', re.compile(r'^/2/tweets$'), 'create_tweet'),
+    ('POST', re.compile(r'^/2/users/\d+/likes$'), 'like'),
+    ('POST', re.compile(r'^/2/users/\d+/retweets$'), 'retweet'),
+    ('GET', re.compile(r'^/2/users/me$'), 'get_me'),
+)
+
+_ID_PATTERN = re.compile(r'/\d+')
+
+
+def endpoint_name(method: str, route: str) -> str:
+    """Endpoint name for a request, e.g. ('POST', '/2/users/12/likes') -> 'like'"""
+    for endpoint_method, pattern, name in ENDPOINTS:
+        if method == endpoint_method and pattern.match(route):
+            return name
+    return f"{method} {_ID_PATTERN.sub('/:id', route)}"
+
+
+class RateLimited(Exception):
+    """Raised instead of calling an endpoint whose rate-limit budget is used up"""
+
+    def __init__(self, endpoint: str, reset_at: float):
+        super().__init__(f"{endpoint} rate limit exhausted until {time.strftime('%H:%M:%S', time.localtime(reset_at))}")
+        self.endpoint = endpoint
+        self.reset_at = reset_at
+
+
+@dataclass
+class Budget:
+    """Rate-limit window of one endpoint as last reported by the API"""
+    limit: int
+    remaining: int
+    reset_at: float
+
+
+class RateLimitTracker:
+    """Per-endpoint request budgets read from x-rate-limit-* response headers
+
+    Endpoints that have not been called yet are assumed to have budget.
+    Budgets are published as rate_limit_remaining/rate_limit_limit gauges.
+    """
+
+    def __init__(self, account: str = ''):
+        self.account = account
+        self._budgets = {}
+        self._lock = threading.Lock()
+
+    def update(self, endpoint: str, headers: Mapping[str, str]):
+        """Record the budget reported with a response (no-op without rate-limit headers)"""
+        try:
+            budget = Budget(
+                limit=int(headers['x-rate-limit-limit']),
+                remaining=int(headers['x-rate-limit-remaining']),
+                reset_at=float(headers['x-rate-limit-reset'])
+            )
+        except (KeyError, TypeError, ValueError):
+            return
+        with self._lock:
+            self._budgets[endpoint] = budget
+        labels = {'endpoint': endpoint, 'account': self.account} if self.account else {'endpoint': endpoint}
+        metrics.gauge('rate_limit_remaining', 'Requests left in the current rate-limit window', **labels).set(budget.remaining)
+        metrics.gauge('rate_limit_limit', 'Requests allowed per rate-limit window', **labels).set(budget.limit)
+        metrics.gauge('rate_limit_reset_timestamp', 'When the current rate-limit window resets', **labels).set(budget.reset_at)
+
+    def budget(self, endpoint: str) -> Optional[Budget]:
+        with self._lock:
+            return self._budgets.get(endpoint)
+
+    def remaining(self, endpoint: str, now: float = None) -> Optional[int]:
+        """Requests left in the current window; None if unknown or the window has reset"""
+        budget = self.budget(endpoint)
+        if budget is None or (time.time() if now is None else now) >= budget.reset_at:
+            return None
+        return budget.remaining
+
+    def available(self, endpoint: str, cost: int = 1) -> bool:
+        remaining = self.remaining(endpoint)
+        return remaining is None or remaining >= cost
+
+    def reset_in(self, endpoint: str) -> float:
+        """Seconds until the endpoint's window resets (0 if it has budget)"""
+        budget = self.budget(endpoint)
+        if budget is None or self.available(endpoint):
+            return 0.0
+        return max(0.0, budget.reset_at - time.time())
+
+    def check(self, endpoint: str, cost: int = 1):
+        """Raise RateLimited if endpoint lacks budget for cost requests"""
+        if not self.available(endpoint, cost):
+            raise RateLimited(endpoint, self.budget(endpoint).reset_at)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {endpoint: dict(vars(budget)) for endpoint, budget in self._budgets.items()}
@@ -0,0 +1,243 @@
+import time
+import random
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+import openai
+import requests
+import tweepy
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Errors worth retrying: throttling, timeouts, dropped connections and 5xx responses
+RETRYABLE_ERRORS = (
+    tweepy.errors.TooManyRequests,
+    tweepy.errors.TwitterServerError,
+    openai.error.RateLimitError,
+    openai.error.APIConnectionError,
+    openai.error.ServiceUnavailableError,
+    openai.error.Timeout,
+    openai.error.TryAgain,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    ConnectionError,
+    TimeoutError
+)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Classify an error as transient (retry) or fatal (give up)"""
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    if isinstance(error, openai.error.APIError):
+        # Generic API errors are retryable only when the server failed
+        return (error.http_status or 500) >= 500
+    return False
+
+
+def is_content_rejection(error: Exception) -> bool:
+    """Whether Twitter refused the tweet text itself (e.g. duplicate content)"""
+    return isinstance(error, tweepy.errors.Forbidden) and 'duplicate' in str(error).lower()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit breaker is open"""
+
+
+class RetryPolicy:
+    """Retry transient failures with jittered exponential backoff"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 30.0,
+                 classify: Callable[[Exception], bool] = is_retryable, sleep: Callable[[float], None] = time.sleep):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.classify = classify
+        self.sleep = sleep
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number attempt (0-based), using full jitter"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Call func, retrying retryable errors; fatal errors and the last failure propagate"""
+        for attempt in range(self.max_attempts):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not self.classify(e) or attempt == self.max_attempts - 1:
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(f"{getattr(func, '__name__', 'call')} failed ({str(e)}); retrying in {delay:.1f}s")
+                self.sleep(delay)
+
+
+class CircuitBreaker:
+    """Stop calling a failing dependency until it has had time to recover
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls fail fast with CircuitOpenError. Once `reset_timeout` has passed a
+    single trial call is let through (half-open); its outcome closes or
+    re-opens the circuit.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 300.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> bool:
+        """Whether a call may go through right now"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"{self.name} circuit closed")
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self._trial_in_flight:
+                    logger.warning(f"{self.name} circuit opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Call func through the breaker"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a latency-bounded call has no result by its deadline"""
+
+
+class Hedger:
+    """Latency-bounded calls with an optional hedged duplicate request
+
+    Each call runs in a worker thread and is abandoned once `deadline`
+    seconds pass. With hedging on, a second identical request is started
+    if the first is still running after the `quantile` of recently
+    achieved latencies, and whichever succeeds first wins. Until enough
+    latencies are known the hedge goes out at half the deadline.
+    """
+
+    def __init__(self, name: str, deadline: float, hedge: bool = False, quantile: float = 0.95,
+                 window: int = 200, min_samples: int = 20, max_workers: int = 4):
+        self.name = name
+        self.deadline = deadline
+        self.hedge = hedge
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name.lower()}-hedge")
+
+    def record(self, seconds: float):
+        """Record the latency of one successful request"""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a hedged request is sent, or None if hedging is off"""
+        if not self.hedge:
+            return None
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < self.min_samples:
+            return self.deadline / 2
+        return latencies[min(len(latencies) - 1, int(self.quantile * len(latencies)))]
+
+    def _timed(self, func: Callable):
+        started = time.monotonic()
+        result = func()
+        self.record(time.monotonic() - started)
+        return result
+
+    def call(self, func: Callable, on_discard: Callable = None):
+        """Return the first successful result of func within the deadline
+
+        The eventual result of a request that lost the race or outlived the
+        deadline is passed to on_discard. Raises the last error if every
+        request failed, or DeadlineExceeded.
+        """
+        started = time.monotonic()
+        hedge_at = self.hedge_delay()
+        if hedge_at is not None:
+            metrics.gauge('hedge_delay_seconds', 'Delay before a hedged request is sent', dependency=self.name).set(hedge_at)
+            if hedge_at >= self.deadline:
+                hedge_at = None
+        pending = {self._executor.submit(self._timed, func)}
+        error = None
+        while pending:
+            until = self.deadline if hedge_at is None else hedge_at
+            done, pending = wait(pending, timeout=max(0.0, until - (time.monotonic() - started)),
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self._discard(pending, on_discard)
+                    return future.result()
+                error = future.exception()
+            if not done:
+                if hedge_at is None:
+                    self._discard(pending, on_discard)
+                    metrics.counter('deadline_exceeded_total', 'Calls abandoned at their deadline',
+                                    dependency=self.name).inc()
+                    raise DeadlineExceeded(f"{self.name} returned nothing within {self.deadline:.1f}s")
+                logger.debug("%s request still running after %.2fs; sending a hedged request", self.name, hedge_at)
+                metrics.counter('hedged_requests_total', 'Duplicate requests sent to cut tail latency',
+                                dependency=self.name).inc()
+                pending.add(self._executor.submit(self._timed, func))
+                hedge_at = None
+        raise error
+
+    @staticmethod
+    def _discard(futures, on_discard: Callable = None):
+        if on_discard is None:
+            return
+
+        def done(future):
+            if future.exception() is None:
+                try:
+                    on_discard(future.result())
+                except Exception as e:
+                    logger.error("Error handling a discarded result: %s", e)
+
+        for future in futures:
+            future.add_done_callback(done)
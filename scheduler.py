@@ -0,0 +1,197 @@
+import os
+import json
+import heapq
+import signal
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """A recurring job: either at fixed times of day or at a fixed interval"""
+
+    def __init__(self, name: str, func: Callable, times: List[str] = None, interval: timedelta = None):
+        self.name = name
+        self.func = func
+        self.times = sorted(datetime.strptime(t, "%H:%M").time() for t in (times or []))
+        self.interval = interval
+        self.last_run = None
+        self.running = threading.Lock()
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First scheduled run strictly after moment"""
+        if self.interval is not None:
+            return moment + self.interval
+        for day in range(2):
+            date = (moment + timedelta(days=day)).date()
+            for at in self.times:
+                candidate = datetime.combine(date, at)
+                if candidate > moment:
+                    return candidate
+        raise ValueError(f"Job {self.name} has no schedule")
+
+    def previous_before(self, moment: datetime) -> Optional[datetime]:
+        """Most recent scheduled run at or before moment"""
+        if self.interval is not None:
+            if self.last_run and self.last_run + self.interval <= moment:
+                return self.last_run + self.interval
+            return None
+        for day in range(2):
+            date = (moment - timedelta(days=day)).date()
+            for at in reversed(self.times):
+                candidate = datetime.combine(date, at)
+                if candidate <= moment:
+                    return candidate
+        return None
+
+
+class EventScheduler:
+    """Heap-based scheduler that sleeps until the next due job
+
+    Jobs run on a thread pool so a long engagement pass never delays a
+    post. A job that is still running when it comes due again is skipped
+    rather than started twice. Last run times are persisted so runs missed
+    while the process was down are caught up (once) after a restart.
+    """
+
+    def __init__(self, state_path: str = 'scheduler_state.json', max_workers: int = 4,
+                 catch_up_window: timedelta = timedelta(hours=6)):
+        self.state_path = state_path
+        self.catch_up_window = catch_up_window
+        self.jobs = {}
+        self._heap = []
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._running = False
+        self._save_lock = threading.Lock()
+        self._last_runs = self._load_last_runs()
+
+    def _load_last_runs(self) -> Dict[str, datetime]:
+        try:
+            if os.path.exists(self.state_path):
+                with open(self.state_path, 'r') as f:
+                    return {name: datetime.fromisoformat(value) for name, value in json.load(f).items()}
+        except Exception as e:
+            logger.error(f"Error loading scheduler state: {str(e)}")
+        return {}
+
+    def _save_last_runs(self):
+        try:
+            with self._save_lock:
+                data = {name: job.last_run.isoformat() for name, job in self.jobs.items() if job.last_run}
+                tmp_path = self.state_path + '.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            logger.error(f"Error saving scheduler state: {str(e)}")
+
+    def _add(self, job: Job) -> Job:
+        now = datetime.now()
+        job.last_run = self._last_runs.get(job.name)
+        next_run = job.next_after(now)
+        if job.interval is not None and job.last_run and job.last_run + job.interval > now:
+            next_run = job.last_run + job.interval
+
+        # Catch up on a run missed while the process was down
+        missed = job.previous_before(now)
+        if job.last_run and missed and job.last_run < missed and now - missed <= self.catch_up_window:
+            logger.info(f"Catching up missed {job.name} run scheduled for {missed.isoformat()}")
+            next_run = now
+
+        with self._condition:
+            self.jobs[job.name] = job
+            heapq.heappush(self._heap, (next_run, job.name, True))
+            self._condition.notify()
+        logger.info(f"Scheduled {job.name}; next run at {next_run.isoformat()}")
+        return job
+
+    def every_day_at(self, name: str, times: List[str], func: Callable) -> Job:
+        """Run func daily at each HH:MM in times (local time)"""
+        return self._add(Job(name, func, times=times))
+
+    def every(self, name: str, interval: timedelta, func: Callable) -> Job:
+        """Run func repeatedly, interval apart"""
+        return self._add(Job(name, func, interval=interval))
+
+    def run_once_at(self, name: str, when: datetime):
+        """Run an already scheduled job once more at when, on top of its regular runs"""
+        with self._condition:
+            heapq.heappush(self._heap, (when, name, False))
+            self._condition.notify()
+        logger.info(f"Extra {name} run at {when.isoformat()}")
+
+    def next_run(self, name: str) -> Optional[datetime]:
+        """When a job is next due"""
+        with self._condition:
+            return min((due for due, job_name, _ in self._heap if job_name == name), default=None)
+
+    def _execute(self, job: Job, due: datetime):
+        try:
+            logger.info(f"Running {job.name} (due {due.isoformat()})")
+            job.func()
+        except Exception as e:
+            logger.error(f"Error in scheduled {job.name}: {str(e)}")
+        finally:
+            job.last_run = datetime.now()
+            job.running.release()
+            self._save_last_runs()
+
+    def _dispatch(self, job: Job, due: datetime):
+        if not job.running.acquire(blocking=False):
+            logger.warning(f"Skipping {job.name} run due {due.isoformat()}: previous run still in progress")
+            return
+        try:
+            self._executor.submit(self._execute, job, due)
+        except RuntimeError:
+            job.running.release()
+
+    def run_forever(self):
+        """Dispatch jobs as they come due until stop() is called"""
+        self._running = True
+        with self._condition:
+            while self._running:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                due = self._heap[0][0]
+                delay = (due - datetime.now()).total_seconds()
+                if delay > 0:
+                    self._condition.wait(timeout=delay)
+                    continue
+                _, name, recurring = heapq.heappop(self._heap)
+                job = self.jobs[name]
+                if recurring:
+                    next_due = job.next_after(due)
+                    now = datetime.now()
+                    if next_due <= now:
+                        # Fell behind by more than one period; don't replay every missed run
+                        next_due = job.next_after(now)
+                    heapq.heappush(self._heap, (next_due, name, True))
+                self._dispatch(job, due)
+
+    def stop(self, wait: bool = True):
+        """Stop dispatching and optionally wait for running jobs"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._executor.shutdown(wait=wait)
+
+    def stop_on_signals(self, signals=(signal.SIGTERM,)):
+        """Make run_forever return on these signals, so callers' cleanup runs
+
+        Platforms such as Heroku stop processes with SIGTERM, which would
+        otherwise end Python without running finally blocks. Must be called
+        from the main thread.
+        """
+        def handler(signum, frame):
+            logger.info(f"Received {signal.Signals(signum).name}; shutting down")
+            # The caller's own stop() waits for running jobs
+            self.stop(wait=False)
+
+        for signum in signals:
+            signal.signal(signum, handler)
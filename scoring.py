@@ -0,0 +1,93 @@
+import heapq
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from search import snowflake_timestamp
+
+# Columns gathered from public_metrics for every candidate
+METRIC_FIELDS = ('like_count', 'retweet_count', 'reply_count', 'quote_count')
+
+
+@dataclass
+class ScoringFormula:
+    """Weighted engagement score with exponential decay by tweet age
+
+    score = (likes * likes_weight + retweets * retweets_weight
+             + replies * replies_weight + quotes * quotes_weight) * 0.5 ** (age_hours / half_life_hours)
+
+    Candidates with like_threshold likes or fewer are never selected.
+    """
+    likes: float = 1.0
+    retweets: float = 2.0
+    replies: float = 3.0
+    quotes: float = 3.0
+    half_life_hours: float = 24.0
+    like_threshold: int = 0
+
+    @classmethod
+    def parse(cls, spec: str, **defaults) -> 'ScoringFormula':
+        """Build a formula from "likes=1,retweets=2,..." on top of keyword defaults
+
+        Values given in spec win over the defaults.
+        """
+        values = dict(defaults)
+        for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+            name, _, value = item.partition('=')
+            name = name.strip()
+            if name not in cls.__dataclass_fields__:
+                raise ValueError(f"Unknown scoring weight: {name}")
+            values[name] = float(value)
+        return cls(**values)
+
+
+class CandidateColumns:
+    """Engagement candidates stored column by column in flat arrays"""
+
+    def __init__(self):
+        self.ids = []
+        self.likes = array('d')
+        self.retweets = array('d')
+        self.replies = array('d')
+        self.quotes = array('d')
+        self.created = array('d')
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, tweet_id: str, public_metrics: Dict, created_at: float = None):
+        self.ids.append(tweet_id)
+        self.likes.append(public_metrics.get('like_count', 0))
+        self.retweets.append(public_metrics.get('retweet_count', 0))
+        self.replies.append(public_metrics.get('reply_count', 0))
+        self.quotes.append(public_metrics.get('quote_count', 0))
+        self.created.append(created_at if created_at is not None else snowflake_timestamp(tweet_id))
+
+    @classmethod
+    def from_tweets(cls, tweets: Iterable) -> 'CandidateColumns':
+        columns = cls()
+        for tweet in tweets:
+            columns.append(str(tweet.id), tweet.public_metrics or {})
+        return columns
+
+    def scores(self, formula: ScoringFormula, now: float = None) -> array:
+        """Score every candidate in one pass over the columns"""
+        now = time.time() if now is None else now
+        decay = 0.5 ** (1 / (formula.half_life_hours * 3600)) if formula.half_life_hours > 0 else 1.0
+        wl, wr, wp, wq, floor = formula.likes, formula.retweets, formula.replies, formula.quotes, formula.like_threshold
+        return array('d', map(
+            lambda likes, retweets, replies, quotes, created: (
+                (likes * wl + retweets * wr + replies * wp + quotes * wq) * decay ** max(0.0, now - created)
+                if likes > floor else float('-inf')
+            ),
+            self.likes, self.retweets, self.replies, self.quotes, self.created
+        ))
+
+    def top_k(self, k: int, formula: ScoringFormula, now: float = None) -> List[Tuple[str, float]]:
+        """The k best (tweet_id, score) pairs, best first, skipping filtered candidates"""
+        if k <= 0 or not self.ids:
+            return []
+        scores = self.scores(formula, now)
+        best = heapq.nlargest(k, range(len(scores)), key=scores.__getitem__)
+        return [(self.ids[i], scores[i]) for i in best if scores[i] != float('-inf')]
@@ -0,0 +1,197 @@
+import re
+import math
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, List, Optional
+
+# Twitter snowflake ids encode their creation time in milliseconds since this epoch
+TWITTER_EPOCH_MS = 1288834974657
+
+# Operators appended to every engagement search
+QUERY_SUFFIX = "-is:retweet -is:reply lang:en"
+
+# Query length limit of search_recent_tweets on the standard access levels
+MAX_QUERY_LENGTH = 512
+
+# max_results bounds of search_recent_tweets
+MIN_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+# search_recent_tweets rejects a since_id older than its 7-day window
+RECENT_SEARCH_WINDOW = 7 * 24 * 3600
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def snowflake_timestamp(tweet_id) -> float:
+    """Creation time (epoch seconds) encoded in a tweet id"""
+    return ((int(tweet_id) >> 22) + TWITTER_EPOCH_MS) / 1000
+
+
+def newer_id(current, candidate) -> Optional[str]:
+    """The newer of two tweet ids, as a string"""
+    if candidate is None:
+        return current
+    if current is None or int(candidate) > int(current):
+        return str(candidate)
+    return current
+
+
+def usable_since_id(since_id, margin: float = 3600) -> Optional[str]:
+    """since_id if it is still inside the recent-search window, else None"""
+    if since_id is None:
+        return None
+    try:
+        age = time.time() - snowflake_timestamp(since_id)
+    except (TypeError, ValueError):
+        return None
+    return str(since_id) if age < RECENT_SEARCH_WINDOW - margin else None
+
+
+class SearchCache:
+    """Short-lived LRU cache of search results keyed by query"""
+
+    def __init__(self, ttl: float = 300, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable):
+        """Cached value for key, or None if missing or expired"""
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            record = self._entries.get(key)
+            if record is None:
+                return None
+            stored_at, value = record
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class PageSizer:
+    """Adaptive max_results per search query
+
+    Tracks what share of each query's results qualified as candidates and
+    how many results a page returned when the query ran dry, then sizes
+    the next pages to yield about `target` qualifying tweets: bigger pages
+    for busy queries where few results qualify, small ones for quiet
+    queries that never fill a page anyway.
+    """
+
+    def __init__(self, target: int = 10, default: int = MIN_PAGE_SIZE, smoothing: float = 0.3):
+        self.target = target
+        self.default = default
+        self.smoothing = smoothing
+        self._yield = {}
+        self._supply = {}
+        self._lock = threading.Lock()
+
+    def _smooth(self, values: dict, key: Hashable, value: float):
+        previous = values.get(key)
+        values[key] = value if previous is None else previous + self.smoothing * (value - previous)
+
+    def record(self, key: Hashable, page_size: int, returned: int, qualifying: int, last: bool = False):
+        """Record one page; last is True when the query had no further pages"""
+        with self._lock:
+            if returned:
+                self._smooth(self._yield, key, qualifying / returned)
+            if last and returned < page_size:
+                self._smooth(self._supply, key, returned)
+
+    def size(self, key: Hashable) -> int:
+        """max_results for the next pages of a query, a multiple of 10 within the API's bounds"""
+        with self._lock:
+            share = self._yield.get(key)
+            supply = self._supply.get(key)
+        size = self.default if share is None else self.target / max(share, 0.01)
+        if supply is not None:
+            size = min(size, supply)
+        return max(MIN_PAGE_SIZE, min(MAX_PAGE_SIZE, math.ceil(size / 10) * 10))
+
+
+@dataclass
+class PlannedQuery:
+    """One search request covering one or more topics"""
+    query: str
+    topics: List[str]
+
+
+class QueryPlanner:
+    """Pack topics into as few OR-combined search queries as the length limit allows
+
+    Results of a combined query are routed back to the topics whose words
+    all appear in the tweet text, mirroring how the search API matched them.
+    """
+
+    def __init__(self, suffix: str = QUERY_SUFFIX, max_length: int = MAX_QUERY_LENGTH, coalesce: bool = True):
+        self.suffix = suffix
+        self.max_length = max_length
+        self.coalesce = coalesce
+        self._topic_words = {}
+
+    @staticmethod
+    def clause(topic: str) -> str:
+        """Search clause for one topic; multi-word topics are grouped"""
+        return f"({topic})" if ' ' in topic else topic
+
+    def single(self, topic: str) -> str:
+        return f"{topic} {self.suffix}"
+
+    def plan(self, topics: List[str]) -> List[PlannedQuery]:
+        """Greedily pack topics into combined queries within max_length"""
+        if not self.coalesce:
+            return [PlannedQuery(self.single(topic), [topic]) for topic in topics]
+
+        planned = []
+        group = []
+        for topic in topics:
+            candidate = group + [topic]
+            if group and len(self._combined(candidate)) > self.max_length:
+                planned.append(self._build(group))
+                group = [topic]
+            else:
+                group = candidate
+        if group:
+            planned.append(self._build(group))
+
+        return planned
+
+    def _combined(self, topics: List[str]) -> str:
+        return f"({' OR '.join(self.clause(topic) for topic in topics)}) {self.suffix}"
+
+    def _build(self, topics: List[str]) -> PlannedQuery:
+        query = self.single(topics[0]) if len(topics) == 1 else self._combined(topics)
+        return PlannedQuery(query, list(topics))
+
+    def _words(self, topic: str) -> set:
+        words = self._topic_words.get(topic)
+        if words is None:
+            words = self._topic_words[topic] = set(_WORD_PATTERN.findall(topic.lower()))
+        return words
+
+    def route(self, text: str, topics: List[str]) -> List[str]:
+        """Topics of a planned query that a tweet's text matches"""
+        if len(topics) == 1:
+            return list(topics)
+        words = set(_WORD_PATTERN.findall((text or '').lower()))
+        return [topic for topic in topics if self._words(topic) <= words]
@@ -0,0 +1,128 @@
+import time
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterator, Tuple
+
+
+def normalize_tweet_id(tweet_id) -> str:
+    """Normalize a tweet id so tweepy ints and JSON-loaded strings compare equal"""
+    return str(tweet_id).strip()
+
+
+class BloomFilter:
+    """Compact probabilistic set used as a fast negative check"""
+
+    def __init__(self, capacity: int = 100000, hash_count: int = 4, bits_per_item: int = 10):
+        self.size = max(64, capacity * bits_per_item)
+        self.hash_count = hash_count
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8 * self.hash_count).digest()
+        for i in range(self.hash_count):
+            yield int.from_bytes(digest[i * 8:(i + 1) * 8], 'little') % self.size
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def clear(self):
+        self.bits = bytearray(len(self.bits))
+
+
+class SeenIndex:
+    """Bounded dedup index of engaged tweets with time-based eviction
+
+    Entries are kept in insertion order so expired ones are always at the
+    front and eviction only touches what it removes. An optional Bloom
+    filter answers most "never seen" lookups without touching the dict.
+    """
+
+    def __init__(self, ttl_seconds: float = 7 * 24 * 3600, max_entries: int = 100000,
+                 use_bloom: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._bloom = BloomFilter(capacity=max_entries) if use_bloom else None
+        self._evicted_since_rebuild = 0
+
+    @classmethod
+    def from_dict(cls, data: Dict, **kwargs) -> 'SeenIndex':
+        """Build an index from a serialized {tweet_id: entry} mapping"""
+        index = cls(**kwargs)
+        records = sorted(
+            ((normalize_tweet_id(key), entry, cls._entry_time(entry)) for key, entry in data.items()),
+            key=lambda record: record[2]
+        )
+        for key, entry, seen_at in records:
+            index._insert(key, entry, seen_at)
+        index.evict()
+        return index
+
+    @staticmethod
+    def _entry_time(entry: Dict) -> float:
+        try:
+            return datetime.fromisoformat(entry['timestamp']).timestamp()
+        except (TypeError, KeyError, ValueError):
+            return time.time()
+
+    def _insert(self, key: str, entry: Dict, seen_at: float):
+        self._entries.pop(key, None)
+        self._entries[key] = (seen_at, entry)
+        if self._bloom is not None:
+            self._bloom.add(key)
+
+    def __setitem__(self, tweet_id, entry: Dict):
+        self._insert(normalize_tweet_id(tweet_id), entry, self._entry_time(entry))
+        if len(self._entries) > self.max_entries:
+            self.evict()
+
+    def __getitem__(self, tweet_id) -> Dict:
+        return self._entries[normalize_tweet_id(tweet_id)][1]
+
+    def __contains__(self, tweet_id) -> bool:
+        key = normalize_tweet_id(tweet_id)
+        if self._bloom is not None and key not in self._bloom:
+            return False
+        record = self._entries.get(key)
+        if record is None:
+            return False
+        return time.time() - record[0] < self.ttl_seconds
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        for key, (_, entry) in self._entries.items():
+            yield key, entry
+
+    def evict(self, now: float = None) -> int:
+        """Drop expired entries and enforce the size cap; returns the number removed"""
+        cutoff = (now or time.time()) - self.ttl_seconds
+        removed = 0
+        while self._entries:
+            key, (seen_at, _) = next(iter(self._entries.items()))
+            if seen_at >= cutoff and len(self._entries) <= self.max_entries:
+                break
+            self._entries.popitem(last=False)
+            removed += 1
+
+        # Evicted keys stay set in the Bloom filter, so rebuild it once they pile up
+        self._evicted_since_rebuild += removed
+        if self._bloom is not None and self._evicted_since_rebuild > self.max_entries // 2:
+            self._bloom.clear()
+            for key in self._entries:
+                self._bloom.add(key)
+            self._evicted_since_rebuild = 0
+        return removed
+
+    def to_dict(self) -> Dict:
+        """Serialize to a plain {tweet_id: entry} mapping"""
+        return {key: entry for key, (_, entry) in self._entries.items()}
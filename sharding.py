@@ -0,0 +1,189 @@
+import os
+import json
+import math
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    heartbeat REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    partition INTEGER PRIMARY KEY,
+    worker_id TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS engagements (
+    tweet_id TEXT PRIMARY KEY,
+    worker_id TEXT NOT NULL,
+    claimed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS engagements_claimed ON engagements (claimed);
+CREATE TABLE IF NOT EXISTS posts (
+    tweet_id TEXT PRIMARY KEY,
+    entry TEXT NOT NULL
+);
+"""
+
+
+def default_worker_id() -> Optional[str]:
+    """Configured worker name (SHARD_WORKER, else Heroku's DYNO), or None
+
+    Per-worker state files are named after it, so it has to stay the same
+    across restarts.
+    """
+    return os.getenv('SHARD_WORKER') or os.getenv('DYNO')
+
+
+def worker_state_path(path: str, worker_id: str) -> str:
+    """Per-worker variant of a state file, e.g. bot_state.json -> bot_state.worker.1.json"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{worker_id}{ext}"
+
+
+class ShardCoordinator:
+    """Splits topics between worker processes through leases in a shared SQLite file
+
+    Topics are spread over a fixed number of partitions. Every heartbeat a
+    worker renews its leases and claims free or expired partitions up to
+    its fair share of the live workers, releasing any beyond it, so
+    partitions move to the survivors once a dead worker's leases expire
+    and to newcomers as they join. Engaged tweet ids are claimed in the
+    same file, so a tweet found by two shards is only engaged once, and
+    posts are shared there so whichever worker posts sees every past post.
+    """
+
+    def __init__(self, path: str, worker_id: str, partitions: int = 16, lease_seconds: float = 60,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.worker_id = worker_id
+        self.partitions = max(1, partitions)
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+        self._owned = set()
+        self._owned_until = 0.0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE serializes lease changes between the workers sharing the file
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                yield
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+            self._db.execute('COMMIT')
+
+    def heartbeat(self) -> Set[int]:
+        """Renew this worker's leases and rebalance; returns the partitions it now owns"""
+        now = self.clock()
+        expires = now + self.lease_seconds
+        with self._transaction():
+            self._db.execute('INSERT OR REPLACE INTO workers (worker_id, heartbeat) VALUES (?, ?)',
+                             (self.worker_id, now))
+            self._db.execute('DELETE FROM workers WHERE heartbeat < ?', (now - self.lease_seconds,))
+            live = self._db.execute('SELECT COUNT(*) FROM workers').fetchone()[0]
+            share = math.ceil(self.partitions / live)
+
+            self._db.execute('DELETE FROM leases WHERE expires < ? OR partition >= ?', (now, self.partitions))
+            owned = [row[0] for row in self._db.execute(
+                'SELECT partition FROM leases WHERE worker_id = ? ORDER BY partition', (self.worker_id,))]
+            if len(owned) > share:
+                # Hand partitions beyond our share to workers that joined since
+                self._db.executemany('DELETE FROM leases WHERE partition = ?', [(p,) for p in owned[share:]])
+                owned = owned[:share]
+            taken = {row[0] for row in self._db.execute('SELECT partition FROM leases')}
+            free = [p for p in range(self.partitions) if p not in taken]
+            owned += free[:share - len(owned)]
+            self._db.executemany(
+                'INSERT OR REPLACE INTO leases (partition, worker_id, expires) VALUES (?, ?, ?)',
+                [(p, self.worker_id, expires) for p in owned]
+            )
+
+        owned = set(owned)
+        if owned != self._owned:
+            logger.info("Worker %s now owns %d of %d partitions (%d live workers)",
+                        self.worker_id, len(owned), self.partitions, live)
+        self._owned = owned
+        self._owned_until = expires
+        return owned
+
+    def owned(self) -> Set[int]:
+        """Partitions leased at the last heartbeat, if the lease has not lapsed since"""
+        return set(self._owned) if self.clock() < self._owned_until else set()
+
+    def is_leader(self) -> bool:
+        """Whether this worker owns partition 0 and runs the account-wide jobs"""
+        return 0 in self.owned()
+
+    def assigned(self, topics: List[str]) -> List[str]:
+        """The topics in this worker's partitions, in their original order
+
+        Topics are dealt round-robin over the partitions in sorted order, so
+        every worker with the same topic list maps them the same way.
+        """
+        owned = self.owned()
+        partition = {topic: i % self.partitions for i, topic in enumerate(sorted(topics))}
+        return [topic for topic in topics if partition[topic] in owned]
+
+    def claimed(self, tweet_ids: Iterable) -> Set[str]:
+        """Which of the given tweets some worker has already engaged with"""
+        tweet_ids = [str(tweet_id) for tweet_id in tweet_ids]
+        found = set()
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(tweet_ids), 500):
+                chunk = tweet_ids[start:start + 500]
+                found.update(row[0] for row in self._db.execute(
+                    f"SELECT tweet_id FROM engagements WHERE tweet_id IN ({','.join('?' * len(chunk))})", chunk))
+        return found
+
+    def claim_engagement(self, tweet_id) -> bool:
+        """Claim a tweet for this worker; False if another worker already has it"""
+        with self._transaction():
+            cursor = self._db.execute(
+                'INSERT OR IGNORE INTO engagements (tweet_id, worker_id, claimed) VALUES (?, ?, ?)',
+                (str(tweet_id), self.worker_id, self.clock())
+            )
+        return cursor.rowcount == 1
+
+    def forget_engagements(self, older_than: float):
+        """Drop engagement claims made more than older_than seconds ago"""
+        with self._transaction():
+            self._db.execute('DELETE FROM engagements WHERE claimed < ?', (self.clock() - older_than,))
+
+    def share_post(self, entry: Dict):
+        """Record a posted tweet for the other workers"""
+        with self._transaction():
+            self._db.execute('INSERT OR IGNORE INTO posts (tweet_id, entry) VALUES (?, ?)',
+                             (str(entry['id']), json.dumps(entry)))
+
+    def shared_posts(self) -> List[Dict]:
+        """Every post recorded by any worker, oldest first"""
+        with self._lock:
+            return [json.loads(row[0]) for row in self._db.execute('SELECT entry FROM posts ORDER BY rowid')]
+
+    def release(self):
+        """Give up this worker's leases so the others take them over at their next heartbeat"""
+        with self._transaction():
+            self._db.execute('DELETE FROM leases WHERE worker_id = ?', (self.worker_id,))
+            self._db.execute('DELETE FROM workers WHERE worker_id = ?', (self.worker_id,))
+        self._owned = set()
+        self._owned_until = 0.0
+        logger.info("Worker %s released its partitions", self.worker_id)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
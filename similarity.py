@@ -0,0 +1,151 @@
+import re
+import zlib
+import random
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN_PATTERN = re.compile(r"[#@]?\w+")
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index for finding near-duplicate tweets in sublinear time
+
+    Each text is reduced to word shingles and a MinHash signature. The
+    signature is split into bands; two texts are compared only when at
+    least one band hashes to the same bucket, so a query touches a handful
+    of candidates instead of the whole history.
+
+    Only the body of a tweet is shingled: hashtags, mentions and any
+    boilerplate phrases (engagement hooks, intros) are dropped first, so
+    two tweets that differ only in that decoration count as duplicates.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 64, threshold: float = 0.3,
+                 shingle_size: int = 3, seed: int = 1, boilerplate: Iterable[str] = ()):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.boilerplate = sorted({phrase for phrase in boilerplate if _TOKEN_PATTERN.search(phrase)})
+
+        # Boilerplate token sequences keyed by first token, longest first
+        self._boilerplate = defaultdict(list)
+        for phrase in sorted(self.boilerplate, key=lambda p: -len(_TOKEN_PATTERN.findall(p))):
+            tokens = tuple(_TOKEN_PATTERN.findall(phrase.lower()))
+            self._boilerplate[tokens[0]].append(tokens)
+
+        # Permutations must be stable across restarts since signatures are persisted
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+        self._signatures = {}
+        self._buckets = [defaultdict(set) for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def body_tokens(self, text: str) -> List[str]:
+        """Normalized words of text without hashtags, mentions or boilerplate phrases"""
+        tokens = [token for token in _TOKEN_PATTERN.findall(text.lower()) if token[0] not in '#@']
+        body = []
+        i = 0
+        while i < len(tokens):
+            for phrase in self._boilerplate.get(tokens[i], ()):
+                if tuple(tokens[i:i + len(phrase)]) == phrase:
+                    i += len(phrase)
+                    break
+            else:
+                body.append(tokens[i])
+                i += 1
+        return body
+
+    def shingles(self, text: str) -> set:
+        """Split the body of text into word shingles"""
+        tokens = self.body_tokens(text)
+        if len(tokens) < self.shingle_size:
+            return {' '.join(tokens)} if tokens else set()
+        return {
+            ' '.join(tokens[i:i + self.shingle_size])
+            for i in range(len(tokens) - self.shingle_size + 1)
+        }
+
+    def signature(self, text: str) -> List[int]:
+        """Compute the MinHash signature of a text"""
+        hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in self.shingles(text)]
+        if not hashes:
+            return [_MAX_HASH] * self.num_perm
+        return [
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+            for a, b in self._permutations
+        ]
+
+    def _band_keys(self, signature: List[int]):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, tuple(signature[start:start + self.rows])
+
+    def add_signature(self, key: str, signature: List[int]):
+        """Index a precomputed signature under key"""
+        key = str(key)
+        self._signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band][band_key].add(key)
+
+    def add(self, key: str, text: str):
+        """Index a text under key"""
+        self.add_signature(key, self.signature(text))
+
+    def query(self, text: str) -> Optional[Tuple[str, float]]:
+        """Return (key, estimated similarity) of the closest indexed near-duplicate, if any"""
+        signature = self.signature(text)
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+
+        best = None
+        for key in candidates:
+            other = self._signatures[key]
+            similarity = sum(1 for x, y in zip(signature, other) if x == y) / self.num_perm
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+    def to_dict(self) -> Dict:
+        """Serialize parameters and signatures for the state snapshot"""
+        return {
+            'num_perm': self.num_perm,
+            'bands': self.bands,
+            'shingle_size': self.shingle_size,
+            'seed': self.seed,
+            'boilerplate': self.boilerplate,
+            'signatures': self._signatures
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, threshold: float = 0.3, boilerplate: Iterable[str] = ()) -> 'NearDuplicateIndex':
+        """Rebuild an index from a serialized snapshot
+
+        Raises ValueError if the snapshot was shingled with other boilerplate,
+        since its signatures would not be comparable with new ones.
+        """
+        index = cls(
+            num_perm=data['num_perm'],
+            bands=data['bands'],
+            threshold=threshold,
+            shingle_size=data['shingle_size'],
+            seed=data['seed'],
+            boilerplate=boilerplate
+        )
+        if data.get('boilerplate') != index.boilerplate:
+            raise ValueError("similarity index was built with different boilerplate")
+        for key, signature in data['signatures'].items():
+            index.add_signature(key, signature)
+        return index
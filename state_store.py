@@ -0,0 +1,109 @@
+import os
+import json
+import logging
+import threading
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StateStore:
+    """Append-only journal of bot events with periodic snapshot compaction
+
+    Every engagement or post is written as one small JSON line to the
+    journal, so the cost of recording an event does not depend on how much
+    history has accumulated. Once the journal holds `compact_every` events
+    the caller folds it into a new snapshot via `compact`.
+    """
+
+    def __init__(self, snapshot_path: str = 'bot_state.json', journal_path: str = None,
+                 compact_every: int = 1000, fsync: bool = False):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or os.path.splitext(snapshot_path)[0] + '.journal'
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.pending_events = 0
+        # Sequence number of the last journaled event; snapshots record the one they include
+        self.sequence = 0
+        self._lock = threading.Lock()
+        self._journal = None
+
+    def load(self) -> Tuple[Dict, List[Tuple[str, object]]]:
+        """Read the snapshot and the journal events recorded since it was written
+
+        Events the snapshot already includes (left behind by a crash between
+        writing it and truncating the journal) are skipped, and a torn final
+        line is cut off so the next append starts on a fresh line.
+        """
+        state = {}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r') as f:
+                state = json.load(f)
+        snapshot_sequence = state.pop('journal_seq', 0)
+        self.sequence = snapshot_sequence
+
+        events = []
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'rb') as f:
+                data = f.read()
+            complete = data.rfind(b'\n') + 1
+            if complete < len(data):
+                # A crash mid-append left a torn final line
+                logger.warning(f"Truncating torn journal line ({len(data) - complete} bytes)")
+                with open(self.journal_path, 'r+b') as f:
+                    f.truncate(complete)
+            for line_number, line in enumerate(data[:complete].splitlines(), 1):
+                try:
+                    record = json.loads(line)
+                    event, payload = record['e'], record['d']
+                except (ValueError, KeyError):
+                    logger.warning(f"Skipping unreadable journal line {line_number}")
+                    continue
+                sequence = record.get('s')
+                if sequence is not None:
+                    if sequence <= snapshot_sequence:
+                        continue
+                    self.sequence = max(self.sequence, sequence)
+                events.append((event, payload))
+        self.pending_events = len(events)
+        return state, events
+
+    def append(self, event: str, data) -> bool:
+        """Append one event to the journal; returns True when compaction is due"""
+        with self._lock:
+            self.sequence += 1
+            line = json.dumps({'s': self.sequence, 'e': event, 'd': data}, separators=(',', ':')) + '\n'
+            if self._journal is None:
+                self._journal = open(self.journal_path, 'a')
+            self._journal.write(line)
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self.pending_events += 1
+            return self.pending_events >= self.compact_every
+
+    def compact(self, state: Dict):
+        """Atomically write a full snapshot and truncate the journal
+
+        The snapshot must include every event appended so far; it records the
+        last sequence number so a journal left over by a crash is not replayed.
+        """
+        with self._lock:
+            tmp_path = self.snapshot_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(dict(state, journal_seq=self.sequence), f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            if self._journal is not None:
+                self._journal.close()
+            self._journal = open(self.journal_path, 'w')
+            self.pending_events = 0
+
+    def close(self):
+        """Close the journal file handle"""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
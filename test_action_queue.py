@@ -0,0 +1,142 @@
+import threading
+import unittest
+
+from action_queue import ActionQueue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ActionQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.dispatched = []
+        self.retry_after = {}
+
+    def dispatch(self, endpoint: str, tweet_id: str):
+        self.dispatched.append((endpoint, tweet_id))
+        return self.retry_after.pop((endpoint, tweet_id), None)
+
+    def queue(self, rates, **kwargs) -> ActionQueue:
+        return ActionQueue(self.dispatch, rates, clock=self.clock, **kwargs)
+
+    def drain(self, queue: ActionQueue):
+        """Pop every action ready at the current time"""
+        popped = []
+        while True:
+            action, wait = queue._next_ready()
+            if action is None:
+                return popped, wait
+            popped.append(action[:2])
+
+    def test_paces_each_endpoint_by_its_rate(self):
+        queue = self.queue({'like': 0.5, 'retweet': 1.0})
+        for tweet_id in ('1', '2', '3'):
+            queue.put('like', tweet_id)
+            queue.put('retweet', tweet_id)
+
+        popped, wait = self.drain(queue)
+        self.assertEqual(popped, [('like', '1'), ('retweet', '1')])
+        self.assertEqual(wait, 1.0)
+
+        self.clock.now += 1
+        popped, wait = self.drain(queue)
+        self.assertEqual(popped, [('retweet', '2')])
+        self.assertEqual(wait, 1.0)
+
+        self.clock.now += 1
+        popped, _ = self.drain(queue)
+        self.assertEqual(popped, [('like', '2'), ('retweet', '3')])
+
+    def test_burst_lets_the_oldest_actions_through_first(self):
+        queue = self.queue({'like': 1.0}, burst=2)
+        for tweet_id in ('1', '2', '3'):
+            queue.put('like', tweet_id)
+        popped, wait = self.drain(queue)
+        self.assertEqual(popped, [('like', '1'), ('like', '2')])
+        self.assertEqual(wait, 1.0)
+
+    def test_duplicate_puts_are_ignored(self):
+        queue = self.queue({'like': 1.0})
+        self.assertTrue(queue.put('like', 1))
+        self.assertFalse(queue.put('like', '1'))
+        self.assertEqual(len(queue), 1)
+
+    def test_paused_endpoint_keeps_its_actions(self):
+        queue = self.queue({'like': 0, 'retweet': 1.0})
+        queue.put('like', '1')
+        queue.put('retweet', '2')
+
+        popped, wait = self.drain(queue)
+        self.assertEqual(popped, [('retweet', '2')])
+        self.assertEqual(wait, float('inf'))
+
+        self.clock.now += 3600
+        popped, wait = self.drain(queue)
+        self.assertEqual(popped, [])
+        self.assertEqual(wait, float('inf'))
+        self.assertEqual(queue.pending(), [{'endpoint': 'like', 'tweet_id': '1'}])
+
+    def test_requeued_action_goes_back_to_the_head(self):
+        queue = self.queue({'like': 10.0, 'retweet': 10.0}, burst=10)
+        for tweet_id in ('1', '2', '3'):
+            queue.put('like', tweet_id)
+        queue.put('retweet', '4')
+
+        action, _ = queue._next_ready()
+        self.assertEqual(action[:2], ('like', '1'))
+        queue._requeue(action, 30)
+        self.assertEqual([item['tweet_id'] for item in queue.pending()], ['1', '2', '3', '4'])
+
+        # Only the paused endpoint waits
+        popped, wait = self.drain(queue)
+        self.assertEqual(popped, [('retweet', '4')])
+        self.assertEqual(wait, 30)
+
+        self.clock.now += 30
+        popped, _ = self.drain(queue)
+        self.assertEqual(popped, [('like', '1'), ('like', '2'), ('like', '3')])
+
+    def test_dispatcher_requeues_on_retry_after(self):
+        queue = ActionQueue(self.dispatch, {'like': 1e9}, burst=10)
+        self.retry_after[('like', '1')] = 3600
+        queue.put('like', '1')
+        queue.put('like', '2')
+        queue.start()
+        try:
+            self.assertFalse(queue.join(timeout=0.2))
+        finally:
+            queue.stop()
+        self.assertEqual(self.dispatched, [('like', '1')])
+        self.assertEqual(queue.pending(), [{'endpoint': 'like', 'tweet_id': '1'}, {'endpoint': 'like', 'tweet_id': '2'}])
+
+    def test_join_waits_for_dispatch_but_not_for_paused_endpoints(self):
+        release = threading.Event()
+
+        def dispatch(endpoint, tweet_id):
+            release.wait(5)
+            self.dispatched.append((endpoint, tweet_id))
+
+        queue = ActionQueue(dispatch, {'like': 1e9, 'retweet': 0}, burst=10)
+        queue.put('like', '1')
+        queue.put('like', '2')
+        queue.put('retweet', '3')
+        queue.start()
+        try:
+            # The first like is in flight until released
+            self.assertFalse(queue.join(timeout=0.1))
+            release.set()
+            self.assertTrue(queue.join(timeout=5))
+        finally:
+            queue.stop()
+        self.assertEqual(self.dispatched, [('like', '1'), ('like', '2')])
+        self.assertEqual(queue.pending(), [{'endpoint': 'retweet', 'tweet_id': '3'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from sharding import ShardCoordinator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ShardCoordinatorTest(unittest.TestCase):
+    partitions = 16
+    lease_seconds = 60
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'shards.db')
+        self.clock = FakeClock()
+        self.coordinators = []
+
+    def tearDown(self):
+        for coordinator in self.coordinators:
+            coordinator.close()
+        shutil.rmtree(self.directory)
+
+    def worker(self, worker_id: str) -> ShardCoordinator:
+        coordinator = ShardCoordinator(self.path, worker_id, partitions=self.partitions,
+                                       lease_seconds=self.lease_seconds, clock=self.clock)
+        self.coordinators.append(coordinator)
+        return coordinator
+
+    def assert_disjoint(self, workers):
+        seen = set()
+        for coordinator in workers:
+            owned = coordinator.owned()
+            self.assertFalse(owned & seen, f"{coordinator.worker_id} owns partitions held by another worker")
+            seen |= owned
+        return seen
+
+    def settle(self, workers, rounds: int = 3, stalled=()):
+        """Heartbeat the workers in turn, checking that no leases overlap, stalled workers' included"""
+        for _ in range(rounds):
+            for coordinator in workers:
+                coordinator.heartbeat()
+                self.assert_disjoint(list(workers) + list(stalled))
+            self.clock.now += self.lease_seconds / 3
+
+    def assert_partitioned(self, workers):
+        self.assertEqual(self.assert_disjoint(workers), set(range(self.partitions)))
+        sizes = sorted(len(coordinator.owned()) for coordinator in workers)
+        self.assertLessEqual(sizes[-1] - sizes[0], -(-self.partitions // len(workers)))
+        self.assertEqual(sum(coordinator.is_leader() for coordinator in workers), 1)
+
+    def test_single_worker_owns_everything(self):
+        a = self.worker('a')
+        self.assertEqual(a.heartbeat(), set(range(self.partitions)))
+        self.assertTrue(a.is_leader())
+
+    def test_joining_workers_get_a_share(self):
+        a, b, c = self.worker('a'), self.worker('b'), self.worker('c')
+        self.settle([a])
+        self.settle([a, b])
+        self.assert_partitioned([a, b])
+        self.assertEqual(len(a.owned()), -(-self.partitions // 2))
+
+        self.settle([a, b, c])
+        self.assert_partitioned([a, b, c])
+        self.assertTrue(c.owned())
+
+    def test_leaving_worker_hands_over_its_partitions(self):
+        a, b, c = self.worker('a'), self.worker('b'), self.worker('c')
+        self.settle([a, b, c])
+        leaving = c.owned()
+
+        c.release()
+        self.assertEqual(c.owned(), set())
+        self.settle([a, b])
+        self.assert_partitioned([a, b])
+        self.assertLessEqual(leaving, a.owned() | b.owned())
+
+    def test_expired_worker_is_taken_over(self):
+        a, b, c = self.worker('a'), self.worker('b'), self.worker('c')
+        self.settle([a, b, c])
+        self.assert_partitioned([a, b, c])
+
+        # c stops heartbeating; its leases lapse locally as well as in the file
+        self.settle([a, b], rounds=4, stalled=[c])
+        self.assertEqual(c.owned(), set())
+        self.assert_partitioned([a, b])
+
+        # and it rejoins without stealing partitions still leased to others
+        self.settle([a, b, c])
+        self.assert_partitioned([a, b, c])
+
+    def test_engagement_is_claimed_once(self):
+        a, b = self.worker('a'), self.worker('b')
+        self.assertTrue(a.claim_engagement(1))
+        self.assertFalse(b.claim_engagement('1'))
+        self.assertTrue(b.claim_engagement('2'))
+        self.assertEqual(a.claimed(['1', '2', '3']), {'1', '2'})
+
+        self.clock.now += 3600
+        b.forget_engagements(older_than=60)
+        self.assertEqual(b.claimed(['1', '2']), set())
+        self.assertTrue(b.claim_engagement('1'))
+
+
+class UnevenShardCoordinatorTest(ShardCoordinatorTest):
+    partitions = 5
+    lease_seconds = 30
+
+
+if __name__ == '__main__':
+    unittest.main()
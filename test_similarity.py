@@ -0,0 +1,59 @@
+import unittest
+
+from mock_templates import MOCK_TEMPLATES, MockTemplateEngine
+from similarity import NearDuplicateIndex
+from tweet_text import normalize_tweet
+
+HOOKS = ["🤔 What's your take on this?", "💭 Share your experience!", "🔄 RT if you agree"]
+INTROS = {
+    'morning': ["☀️ Morning motivation for devs", "🎯 Set your coding goals"],
+    'afternoon': ["⚡ Quick productivity hack"],
+    'evening': ["📚 Evening learning session"]
+}
+
+
+def mock_engine(template: str) -> MockTemplateEngine:
+    return MockTemplateEngine(
+        ["software development", "cloud solutions", "API development"],
+        ["#Tech", "#Programming"],
+        ["#Python", "#DevOps"],
+        ["#CareerGrowth", "#DevLife"],
+        HOOKS,
+        INTROS,
+        templates=[template]
+    )
+
+
+class NearDuplicateIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = NearDuplicateIndex(boilerplate=HOOKS + [i for intros in INTROS.values() for i in intros])
+
+    def test_rejects_mock_tweets_from_the_same_template(self):
+        for template in MOCK_TEMPLATES:
+            index = NearDuplicateIndex(boilerplate=self.index.boilerplate)
+            first, *variants = [normalize_tweet(t) for t in mock_engine(template).generate_batch(6, seed=1)]
+            index.add('1', first)
+            for variant in variants:
+                self.assertIsNotNone(index.query(variant), variant)
+
+    def test_ignores_hook_and_hashtag_differences(self):
+        self.index.add('1', "💎 Testing golden rule:\n\nShip small changes.\n\n🔄 RT if you agree\n\n#Tech #Python #DevLife")
+        match = self.index.query("💎 Testing golden rule:\n\nShip small changes.\n\n💭 Share your experience!\n\n#Programming")
+        self.assertEqual(match, ('1', 1.0))
+
+    def test_keeps_mock_tweets_from_other_templates(self):
+        for i, template in enumerate(MOCK_TEMPLATES):
+            self.index.add(str(i), normalize_tweet(mock_engine(template).render(hour=9)))
+        self.assertIsNone(self.index.query("Profile before you optimize: the slow part is rarely where you think."))
+
+    def test_snapshot_with_other_boilerplate_is_rejected(self):
+        self.index.add('1', "Profile before you optimize.")
+        data = self.index.to_dict()
+        self.assertEqual(NearDuplicateIndex.from_dict(data, boilerplate=self.index.boilerplate).query(
+            "Profile before you optimize."), ('1', 1.0))
+        with self.assertRaises(ValueError):
+            NearDuplicateIndex.from_dict(data, boilerplate=HOOKS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from state_store import StateStore
+
+
+class StateStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'bot_state.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def reopen(self, store: StateStore):
+        store.close()
+        store = StateStore(self.path)
+        return store, store.load()
+
+    def test_replays_journal_on_top_of_snapshot(self):
+        store = StateStore(self.path)
+        store.load()
+        store.append('post', {'id': '1'})
+        store.compact({'post_history': [{'id': '1'}]})
+        store.append('post', {'id': '2'})
+
+        store, (state, events) = self.reopen(store)
+        self.assertEqual(state, {'post_history': [{'id': '1'}]})
+        self.assertEqual(events, [('post', {'id': '2'})])
+        store.close()
+
+    def test_torn_tail_does_not_swallow_next_event(self):
+        store = StateStore(self.path)
+        store.load()
+        store.append('post', {'id': '1'})
+        store.close()
+        with open(store.journal_path, 'a') as f:
+            f.write('{"s":2,"e":"post","d":{"id":')
+
+        store, (_, events) = self.reopen(store)
+        self.assertEqual(events, [('post', {'id': '1'})])
+        store.append('post', {'id': '3'})
+
+        store, (_, events) = self.reopen(store)
+        self.assertEqual(events, [('post', {'id': '1'}), ('post', {'id': '3'})])
+        store.close()
+
+    def test_skips_events_already_in_snapshot(self):
+        store = StateStore(self.path)
+        store.load()
+        store.append('post', {'id': '1'})
+        store.append('post', {'id': '2'})
+        store.close()
+        journal = open(store.journal_path).read()
+        store = StateStore(self.path)
+        store.load()
+        store.compact({'post_history': [{'id': '1'}, {'id': '2'}]})
+        store.close()
+        # Crash between replacing the snapshot and truncating the journal
+        with open(store.journal_path, 'w') as f:
+            f.write(journal)
+
+        store, (state, events) = self.reopen(store)
+        self.assertEqual(len(state['post_history']), 2)
+        self.assertEqual(events, [])
+        store.append('post', {'id': '3'})
+
+        store, (_, events) = self.reopen(store)
+        self.assertEqual(events, [('post', {'id': '3'})])
+        store.close()
+
+    def test_replays_journals_written_without_sequence_numbers(self):
+        with open(os.path.splitext(self.path)[0] + '.journal', 'w') as f:
+            f.write(json.dumps({'e': 'post', 'd': {'id': '1'}}) + '\n')
+        store = StateStore(self.path)
+        _, events = store.load()
+        self.assertEqual(events, [('post', {'id': '1'})])
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
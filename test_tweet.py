@@ -1,12 +1,7 @@
-from twitter_bot import TwitterBot
+"""Kept for existing setups; use `python cli.py post-once` instead"""
+import sys
 
-def test_single_tweet():
-    bot = TwitterBot()
-    success = bot.post_tweet()
-    if success:
-        print("\nTweet posted successfully! Check your Twitter profile.")
-    else:
-        print("\nFailed to post tweet. Check the logs for details.")
+from cli import main
 
 if __name__ == "__main__":
-    test_single_tweet()
+    sys.exit(main(['post-once']))
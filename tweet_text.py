@@ -0,0 +1,150 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List, Tuple
+
+# Twitter's weighted length configuration (twitter-text v3)
+SCALE = 100
+DEFAULT_WEIGHT = 200
+EMOJI_WEIGHT = 200
+URL_WEIGHT = 23 * SCALE
+MAX_WEIGHTED_LENGTH = 280
+LIGHT_RANGES = ((0, 4351), (8192, 8205), (8208, 8223), (8242, 8247))
+
+ELLIPSIS = "..."
+ELLIPSIS_WEIGHT = len(ELLIPSIS) * SCALE
+
+_ZWJ = '\u200d'
+_EMOJI_MODIFIERS = {'\ufe0f', '\u20e3', _ZWJ}
+_SEGMENT_PATTERN = re.compile(r'\S+|\s')
+
+
+def _char_weight(ch: str) -> int:
+    cp = ord(ch)
+    for start, end in LIGHT_RANGES:
+        if start <= cp <= end:
+            return SCALE
+    return DEFAULT_WEIGHT
+
+
+def _is_pictographic(cp: int) -> bool:
+    return (
+        0x1F000 <= cp <= 0x1FAFF
+        or 0x2600 <= cp <= 0x27BF
+        or 0x2300 <= cp <= 0x23FF
+        or 0x2B00 <= cp <= 0x2BFF
+        or cp in (0x00A9, 0x00AE, 0x203C, 0x2049, 0x2122, 0x2139)
+    )
+
+
+def _extends_grapheme(previous: str, ch: str) -> bool:
+    """Approximate extended grapheme cluster rules for the text the bot produces"""
+    cp = ord(ch)
+    if ch in _EMOJI_MODIFIERS or previous[-1] == _ZWJ:
+        return True
+    if 0x1F3FB <= cp <= 0x1F3FF or 0xE0020 <= cp <= 0xE007F or 0xFE00 <= cp <= 0xFE0F:
+        return True
+    if 0x1F1E6 <= cp <= 0x1F1FF:
+        # Regional indicators pair up into flags
+        return len(previous) == 1 and 0x1F1E6 <= ord(previous) <= 0x1F1FF
+    return unicodedata.combining(ch) != 0 or unicodedata.category(ch) in ('Mn', 'Me', 'Mc')
+
+
+def _grapheme_weight(grapheme: str) -> int:
+    if _is_pictographic(ord(grapheme[0])) or (len(grapheme) > 1 and any(c in _EMOJI_MODIFIERS for c in grapheme)):
+        return EMOJI_WEIGHT
+    return sum(_char_weight(c) for c in grapheme)
+
+
+def _graphemes(word: str) -> List[str]:
+    graphemes = []
+    for ch in word:
+        if graphemes and _extends_grapheme(graphemes[-1], ch):
+            graphemes[-1] += ch
+        else:
+            graphemes.append(ch)
+    return graphemes
+
+
+@lru_cache(maxsize=4096)
+def _word_weight(word: str) -> int:
+    if word.startswith(('http://', 'https://')):
+        return URL_WEIGHT
+    if word.isascii():
+        return len(word) * SCALE
+    return sum(_grapheme_weight(grapheme) for grapheme in _graphemes(word))
+
+
+def _split_hashtags(word: str) -> List[str]:
+    """Split hashtags glued to a preceding word, leaving HTML entities like &#39; alone"""
+    pieces = []
+    start = 0
+    position = word.find('#', 1)
+    while position != -1:
+        following = word[position + 1:position + 2]
+        if word[position - 1] != '&' and position > start and (following.isalnum() or following == '_'):
+            pieces.append(word[start:position])
+            start = position
+        position = word.find('#', position + 1)
+    pieces.append(word[start:])
+    return pieces
+
+
+def _scan(content: str, budget: int) -> Tuple[List[str], int, int]:
+    """Tokenize content in one pass
+
+    Returns the normalized words (to be joined by single spaces), their total
+    weight including separators, and how many leading words fit in `budget`.
+    """
+    words = []
+    total = -SCALE
+    word_cut = 0
+    for word in content.split():
+        for piece in (_split_hashtags(word) if '#' in word else (word,)):
+            if piece.startswith(('http://', 'https://')):
+                total += SCALE + URL_WEIGHT
+            else:
+                total += SCALE + _word_weight(piece)
+            words.append(piece)
+            if total <= budget:
+                word_cut = len(words)
+    return words, max(total, 0), word_cut
+
+
+def weighted_length(text: str) -> int:
+    """Length of text as counted by Twitter, in characters"""
+    total = 0
+    for match in _SEGMENT_PATTERN.finditer(text):
+        segment = match.group()
+        if segment.isspace():
+            total += SCALE
+        elif segment.startswith(('http://', 'https://')):
+            total += URL_WEIGHT
+        else:
+            total += _word_weight(segment)
+    return (total + SCALE - 1) // SCALE
+
+
+def normalize_tweet(content: str, max_length: int = MAX_WEIGHTED_LENGTH) -> str:
+    """Collapse whitespace, separate hashtags and truncate to Twitter's weighted length
+
+    Truncation happens at the last word boundary that fits together with the
+    ellipsis, falling back to a grapheme boundary for a single oversized word.
+    """
+    limit = max_length * SCALE
+    budget = limit - ELLIPSIS_WEIGHT
+    words, total, word_cut = _scan(content, budget)
+    if total <= limit:
+        return ' '.join(words)
+    if word_cut:
+        return ' '.join(words[:word_cut]) + ELLIPSIS
+
+    # Not even the first word fits, so cut it between graphemes
+    kept = []
+    weight = 0
+    for grapheme in _graphemes(words[0]):
+        weight += _grapheme_weight(grapheme)
+        if weight > budget:
+            break
+        kept.append(grapheme)
+    return ''.join(kept) + ELLIPSIS
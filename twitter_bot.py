@@ -1,43 +1,67 @@
 import os
 import random
-import time
-import json
-import schedule
-import tweepy
 import openai
+import tweepy
+import itertools
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import logging
-from typing import List, Dict
-import re
-
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('twitter_bot.log'),
-        logging.StreamHandler()
-    ]
-)
+from typing import Iterator, List, Dict
+from state_store import StateStore
+from seen_index import SeenIndex
+from content_pool import ContentPool
+from analytics import PerformanceStore
+from generation_cache import GenerationCache, prompt_key
+from action_queue import ActionQueue
+from similarity import NearDuplicateIndex
+from mock_templates import MockTemplateEngine
+from tweet_text import normalize_tweet, weighted_length
+from scheduler import EventScheduler
+from search import PageSizer, QueryPlanner, SearchCache, newer_id, snowflake_timestamp, usable_since_id
+from scoring import CandidateColumns, ScoringFormula
+from metrics import metrics
+from clients import twitter_client
+from log_setup import setup_logging
+from resilience import CircuitBreaker, CircuitOpenError, Hedger, RetryPolicy, is_content_rejection
+from rate_limits import RateLimited, RateLimitTracker
+from sharding import ShardCoordinator, default_worker_id, worker_state_path
+
 logger = logging.getLogger(__name__)
 
 class TwitterBot:
-    def __init__(self):
-        # Load environment variables
+    def __init__(self, settings: Dict[str, str] = None, state_path: str = 'bot_state.json',
+                 session=None, openai_breaker: CircuitBreaker = None, mock_engine: MockTemplateEngine = None,
+                 shard: ShardCoordinator = None):
+        # Load environment variables; explicit settings (one account in
+        # multi-account mode) take precedence over the environment
         load_dotenv()
+        self.settings = settings or {}
         
         # Initialize API clients
-        self.setup_api_clients()
+        self.setup_api_clients(session)
         
         # Load configuration
         self.load_config()
-        
-        # Initialize state tracking
-        self.engagement_history = {}
-        self.post_history = []
-        self.load_state()
 
+        # Retry and circuit-breaker policies shared by API calls
+        self.twitter_retry = RetryPolicy(self.max_retries, self.retry_base_delay, self.retry_max_delay)
+        self.openai_retry = RetryPolicy(self.openai_max_retries, self.retry_base_delay, self.retry_max_delay)
+        self.openai_breaker = openai_breaker or CircuitBreaker(
+            'OpenAI',
+            failure_threshold=self.openai_breaker_threshold,
+            reset_timeout=self.openai_breaker_reset
+        )
+        # Bounds the latency of generation at post time
+        self.openai_hedger = Hedger(
+            'OpenAI',
+            deadline=self.openai_deadline,
+            hedge=self.openai_hedge,
+            quantile=self.openai_hedge_quantile
+        )
+        
         # Define content strategies with engagement focus
         self.content_types = [
             "growth_hack", "expert_tip", "thought_leadership",
@@ -120,19 +144,72 @@ class TwitterBot:
                 "🌟 Share your daily win"
             ]
         }
+        # Decoration ignored when comparing tweets for near-duplicates
+        self.duplicate_boilerplate = self.engagement_hooks + [
+            intro for intros in self.time_based_content.values() for intro in intros
+        ]
+
+        # Initialize state tracking
+        self.engagement_history = self.new_engagement_index()
+        self.post_history = []
+        self.search_cursors = {}
+        self.deferred_topics = []
+        # Set when this process is one of several workers splitting the topics
+        self.shard = shard
+        self.search_cache = SearchCache(ttl=self.search_cache_ttl)
+        self.query_planner = QueryPlanner(max_length=self.search_query_max_length, coalesce=self.search_coalesce)
+        self.page_sizer = PageSizer(target=self.search_target_candidates)
+        self._state_lock = threading.RLock()
+        self.post_index = NearDuplicateIndex(threshold=self.duplicate_threshold, boilerplate=self.duplicate_boilerplate)
+        self.action_queue = ActionQueue(self.perform_action, self.action_rates, burst=self.action_burst)
+        self.state_store = StateStore(
+            state_path,
+            compact_every=self.state_compact_every,
+            fsync=self.state_fsync
+        )
+        self.load_state()
+
+        # Unused OpenAI generations, served when OpenAI is failing
+        self.generation_cache = GenerationCache(
+            self.getenv('GENERATION_CACHE_PATH') or os.path.splitext(state_path)[0] + '.generations.db',
+            max_entries=self.generation_cache_size,
+            ttl=self.generation_cache_ttl_days * 86400
+        )
+
+        # Metrics of our own posts, refreshed periodically for analysis
+        self.analytics = PerformanceStore(os.path.splitext(state_path)[0] + '.analytics')
+
+        # Mock templates compiled once for the fallback path
+        self.mock_engine = mock_engine or MockTemplateEngine(
+            self.topics_of_interest,
+            self.primary_hashtags,
+            self.tech_hashtags,
+            self.growth_hashtags,
+            self.engagement_hooks,
+            self.time_based_content
+        )
+
+        # Pre-generated tweets, cycling through every content type/topic pair
+        pairs = list(itertools.product(self.content_types, self.topics_of_interest))
+        random.shuffle(pairs)
+        self._prompt_cycle = itertools.cycle(pairs)
+        self._prompt_lock = threading.Lock()
+        self.content_pool = ContentPool(self.generate_pool_batch, target_size=self.content_pool_size)
+
+    def getenv(self, name: str, default=None):
+        """Look up a setting, preferring this bot's explicit settings over the environment"""
+        if name in self.settings:
+            return self.settings[name]
+        return os.getenv(name, default)
 
-    def setup_api_clients(self):
+    def setup_api_clients(self, session=None):
         """Initialize Twitter and OpenAI API clients"""
         try:
-            self.client = tweepy.Client(
-                bearer_token=os.getenv('TWITTER_BEARER_TOKEN'),
-                consumer_key=os.getenv('TWITTER_API_KEY'),
-                consumer_secret=os.getenv('TWITTER_API_SECRET'),
-                access_token=os.getenv('TWITTER_ACCESS_TOKEN'),
-                access_token_secret=os.getenv('TWITTER_ACCESS_TOKEN_SECRET'),
-                wait_on_rate_limit=True
-            )
-            openai.api_key = os.getenv('OPENAI_API_KEY')
+            # Budgets come from response headers; calls are deferred instead of sleeping on a 429
+            self.rate_limits = RateLimitTracker(self.settings.get('name', ''))
+            self.client = twitter_client(self.getenv, session=session, rate_limits=self.rate_limits)
+            # Passed per request so several accounts can share the openai module
+            self.openai_api_key = self.getenv('OPENAI_API_KEY')
             logger.info("API clients initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing API clients: {str(e)}")
@@ -140,215 +217,772 @@ class TwitterBot:
 
     def load_config(self):
         """Load configuration from environment variables"""
-        self.daily_post_count = int(os.getenv('DAILY_POST_COUNT', 3))
-        self.engagement_count = int(os.getenv('ENGAGEMENT_COUNT', 2))
-        self.engagement_ratio = float(os.getenv('ENGAGEMENT_RATIO', 0.6))
-        self.max_hashtags = int(os.getenv('MAX_HASHTAGS', 3))
-        self.content_temperature = float(os.getenv('CONTENT_TEMPERATURE', 0.7))
-        self.min_engagement_followers = int(os.getenv('MIN_ENGAGEMENT_FOLLOWERS', 100))
-        self.max_retries = int(os.getenv('MAX_RETRIES', 3))
-        self.tweet_length = int(os.getenv('TWEET_LENGTH', 240))
+        self.daily_post_count = int(self.getenv('DAILY_POST_COUNT', 3))
+        self.engagement_count = int(self.getenv('ENGAGEMENT_COUNT', 2))
+        self.engagement_ratio = float(self.getenv('ENGAGEMENT_RATIO', 0.6))
+        self.max_hashtags = int(self.getenv('MAX_HASHTAGS', 3))
+        self.content_temperature = float(self.getenv('CONTENT_TEMPERATURE', 0.7))
+        # MIN_ENGAGEMENT_FOLLOWERS is the older name of this setting; it was always compared with likes
+        self.min_engagement_likes = int(self.getenv('MIN_ENGAGEMENT_LIKES', self.getenv('MIN_ENGAGEMENT_FOLLOWERS', 100)))
+        self.engagement_scoring = ScoringFormula.parse(
+            self.getenv('ENGAGEMENT_SCORE_WEIGHTS', ''),
+            half_life_hours=float(self.getenv('ENGAGEMENT_HALF_LIFE_HOURS', 24)),
+            like_threshold=self.min_engagement_likes
+        )
+        self.max_retries = int(self.getenv('MAX_RETRIES', 3))
+        self.tweet_length = int(self.getenv('TWEET_LENGTH', 240))
+        self.search_concurrency = max(1, int(self.getenv('SEARCH_CONCURRENCY', 8)))
+        self.state_compact_every = int(self.getenv('STATE_COMPACT_EVERY', 1000))
+        self.state_fsync = self.getenv('STATE_FSYNC', 'false').lower() == 'true'
+        self.engagement_ttl_hours = float(self.getenv('ENGAGEMENT_TTL_HOURS', 7 * 24))
+        self.engagement_history_max = int(self.getenv('ENGAGEMENT_HISTORY_MAX', 100000))
+        self.engagement_bloom = self.getenv('ENGAGEMENT_BLOOM', 'true').lower() == 'true'
+        self.content_pool_size = int(self.getenv('CONTENT_POOL_SIZE', 6))
+        self.content_batch_size = max(1, int(self.getenv('CONTENT_BATCH_SIZE', 3)))
+        self.duplicate_threshold = float(self.getenv('DUPLICATE_THRESHOLD', 0.3))
+        self.dedup_max_attempts = int(self.getenv('DEDUP_MAX_ATTEMPTS', 5))
+        self.retry_base_delay = float(self.getenv('RETRY_BASE_DELAY', 1.0))
+        self.retry_max_delay = float(self.getenv('RETRY_MAX_DELAY', 30.0))
+        self.openai_max_retries = int(self.getenv('OPENAI_MAX_RETRIES', 2))
+        self.openai_breaker_threshold = int(self.getenv('OPENAI_BREAKER_THRESHOLD', 3))
+        self.openai_breaker_reset = float(self.getenv('OPENAI_BREAKER_RESET', 300))
+        self.openai_deadline = float(self.getenv('OPENAI_DEADLINE', 30))
+        self.openai_hedge = self.getenv('OPENAI_HEDGE', 'false').lower() == 'true'
+        self.openai_hedge_quantile = float(self.getenv('OPENAI_HEDGE_QUANTILE', 0.95))
+        self.search_cache_ttl = float(self.getenv('SEARCH_CACHE_TTL', 300))
+        self.search_coalesce = self.getenv('SEARCH_COALESCE', 'true').lower() == 'true'
+        self.search_query_max_length = int(self.getenv('SEARCH_QUERY_MAX_LENGTH', 512))
+        self.search_max_pages = max(1, int(self.getenv('SEARCH_MAX_PAGES', 3)))
+        self.search_target_candidates = max(1, int(self.getenv('SEARCH_TARGET_CANDIDATES', 10)))
+        # Engagement actions per minute for each endpoint, e.g. "like=2,retweet=2"; 0 pauses an endpoint
+        default_rates = f"like={self.engagement_count},retweet={self.engagement_count}"
+        self.action_rates = {
+            endpoint.strip(): max(0.0, float(rate)) / 60
+            for endpoint, _, rate in (item.partition('=') for item in self.getenv('ACTION_RATES', default_rates).split(','))
+            if rate
+        }
+        self.action_burst = float(self.getenv('ACTION_BURST', 1))
+        self.generation_cache_size = int(self.getenv('GENERATION_CACHE_SIZE', 1000))
+        self.generation_cache_ttl_days = float(self.getenv('GENERATION_CACHE_TTL_DAYS', 30))
+        self.generation_cache_per_prompt = int(self.getenv('GENERATION_CACHE_PER_PROMPT', 2))
+        self.analytics_refresh_hours = float(self.getenv('ANALYTICS_REFRESH_HOURS', 6))
+        self.analytics_window_days = float(self.getenv('ANALYTICS_WINDOW_DAYS', 7))
+        self.post_times = [t.strip() for t in self.getenv('POST_TIMES', '09:00,13:00,17:00').split(',') if t.strip()]
+        self.engage_times = [t.strip() for t in self.getenv('ENGAGE_TIMES', '12:00,18:00').split(',') if t.strip()]
+
+    def new_engagement_index(self, data: Dict = None) -> SeenIndex:
+        """Create the bounded seen-tweet index backing engagement_history"""
+        return SeenIndex.from_dict(
+            data or {},
+            ttl_seconds=self.engagement_ttl_hours * 3600,
+            max_entries=self.engagement_history_max,
+            use_bloom=self.engagement_bloom
+        )
 
     def load_state(self):
-        """Load bot state from file"""
+        """Load bot state by replaying the journal on top of the last snapshot"""
         try:
-            if os.path.exists('bot_state.json'):
-                with open('bot_state.json', 'r') as f:
-                    state = json.load(f)
-                    self.engagement_history = state.get('engagement_history', {})
-                    self.post_history = state.get('post_history', [])
-                logger.info("Bot state loaded successfully")
+            with metrics.timed('state_load'):
+                state, events = self.state_store.load()
+            self.engagement_history = self.new_engagement_index(state.get('engagement_history'))
+            self.post_history = state.get('post_history', [])
+            self.post_index = self.load_post_index(state.get('similarity_index'))
+            self.search_cursors = state.get('search_cursors', {})
+            for action in state.get('pending_actions', []):
+                self.action_queue.put(action['endpoint'], action['tweet_id'])
+            for event, data in events:
+                self.apply_event(event, data)
+            self.engagement_history.evict()
+            logger.info(f"Bot state loaded successfully ({len(events)} journal events replayed)")
         except Exception as e:
             logger.error(f"Error loading bot state: {str(e)}")
 
+    def load_post_index(self, data: Dict = None) -> NearDuplicateIndex:
+        """Restore the near-duplicate index, rebuilding it from post_history if needed"""
+        if data:
+            try:
+                return NearDuplicateIndex.from_dict(
+                    data, threshold=self.duplicate_threshold, boilerplate=self.duplicate_boilerplate
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Rebuilding similarity index from post history: {str(e)}")
+        index = NearDuplicateIndex(threshold=self.duplicate_threshold, boilerplate=self.duplicate_boilerplate)
+        for post in self.post_history:
+            index.add(post['id'], post['content'])
+        return index
+
+    def apply_event(self, event: str, data):
+        """Apply a single journaled event to in-memory state"""
+        if event == 'engagement':
+            self.engagement_history[data['id']] = data['entry']
+        elif event == 'post':
+            self.post_history.append(data)
+            self.post_index.add(data['id'], data['content'])
+        elif event == 'cursor':
+            self.search_cursors[data['topic']] = newer_id(self.search_cursors.get(data['topic']), data['since_id'])
+        elif event == 'action':
+            self.action_queue.put(data['endpoint'], data['tweet_id'])
+        elif event == 'action_done':
+            self.action_queue.discard(data['endpoint'], data['tweet_id'])
+        else:
+            logger.warning(f"Ignoring unknown journal event: {event}")
+
+    def record_event(self, event: str, data):
+        """Apply an event in memory and append it to the state journal"""
+        compaction_due = False
+        # Apply and append under one lock, so a concurrent save_state either
+        # includes the event in its snapshot and journal sequence or neither
+        with self._state_lock:
+            self.apply_event(event, data)
+            try:
+                with metrics.timed('state_journal_append'):
+                    compaction_due = self.state_store.append(event, data)
+            except Exception as e:
+                logger.error(f"Error journaling {event} event: {str(e)}")
+        if compaction_due:
+            self.save_state()
+
+    def record_engagement(self, tweet_id, entry: Dict):
+        """Record an engagement with a tweet"""
+        self.record_event('engagement', {'id': tweet_id, 'entry': entry})
+
+    def record_post(self, entry: Dict):
+        """Record a posted tweet"""
+        self.record_event('post', entry)
+        if self.shard:
+            try:
+                self.shard.share_post(entry)
+            except Exception as e:
+                logger.error("Error sharing post %s with other workers: %s", entry['id'], e)
+
+    def sync_shared_posts(self) -> int:
+        """Exchange post history with the other shard workers; returns the number of posts learned
+
+        Whichever worker holds partition 0 posts, so the one that does needs
+        every earlier post in its history and near-duplicate index.
+        """
+        try:
+            shared = self.shard.shared_posts()
+            with self._state_lock:
+                known = {str(post['id']) for post in self.post_history}
+            shared_ids = {str(post['id']) for post in shared}
+            for post in self.post_history:
+                if str(post['id']) not in shared_ids:
+                    self.shard.share_post(post)
+            learned = [post for post in shared if str(post['id']) not in known]
+            for post in learned:
+                self.record_event('post', post)
+            if learned:
+                logger.info("Learned %d posts from other workers", len(learned))
+            return len(learned)
+        except Exception as e:
+            logger.error("Error syncing posts with other workers: %s", e)
+            return 0
+
+    def shard_heartbeat(self):
+        """Renew this worker's leases and take on or hand off the leader's work"""
+        self.shard.heartbeat()
+        leader = self.shard.is_leader()
+        if leader and not self.content_pool.running:
+            self.sync_shared_posts()
+            self.start_content_pool()
+        elif not leader and self.content_pool.running:
+            # Only the leader posts; don't spend completions on a pool nobody takes from
+            self.stop_content_pool()
+
     def save_state(self):
-        """Save bot state to file"""
+        """Compact the journal into a full state snapshot"""
         try:
-            state = {
-                'engagement_history': self.engagement_history,
-                'post_history': self.post_history
-            }
-            with open('bot_state.json', 'w') as f:
-                json.dump(state, f)
+            with self._state_lock:
+                self.engagement_history.evict()
+                state = {
+                    'engagement_history': self.engagement_history.to_dict(),
+                    'post_history': list(self.post_history),
+                    'similarity_index': self.post_index.to_dict(),
+                    'search_cursors': dict(self.search_cursors),
+                    'pending_actions': self.action_queue.pending()
+                }
+                with metrics.timed('state_save'):
+                    self.state_store.compact(state)
             logger.info("Bot state saved successfully")
         except Exception as e:
             logger.error(f"Error saving bot state: {str(e)}")
 
-    def generate_mock_content(self) -> str:
+    def generate_mock_content(self, topic: str = None) -> str:
         """Generate engaging mock content for testing"""
-        content_type = random.choice(self.content_types)
-        topic = random.choice(self.topics_of_interest)
-        
-        # Select hashtags strategically
-        primary_tag = random.choice(self.primary_hashtags)
-        tech_tag = random.choice(self.tech_hashtags)
-        growth_tag = random.choice(self.growth_hashtags)
-        hashtags = f"{primary_tag} {tech_tag} {growth_tag}"
-        
-        # Add engagement hook
-        engagement_hook = random.choice(self.engagement_hooks)
-        
-        # Get time-appropriate intro
-        hour = datetime.now().hour
-        if 5 <= hour < 12:
-            time_intro = random.choice(self.time_based_content["morning"])
-        elif 12 <= hour < 17:
-            time_intro = random.choice(self.time_based_content["afternoon"])
-        else:
-            time_intro = random.choice(self.time_based_content["evening"])
-        
-        templates = [
-            f"{time_intro}\n\n💡 {topic} pro tip:\n• Start small\n• Build consistently\n• Share progress\n\n{engagement_hook}\n\n{hashtags}",
-            f"🔥 Want to excel in {topic}?\n\n3 game-changing practices:\n1️⃣ Code daily\n2️⃣ Read documentation\n3️⃣ Build projects\n\n{engagement_hook}\n\n{hashtags}",
-            f"🚀 {topic} wisdom:\n\nWhat I wish I knew earlier:\n• Test early\n• Document well\n• Seek feedback\n\n{engagement_hook}\n\n{hashtags}",
-            f"{time_intro}\n\nMy top 3 tools for {topic}:\n🛠️ [Tool 1]\n⚡ [Tool 2]\n🔧 [Tool 3]\n\n{engagement_hook}\n\n{hashtags}",
-            f"💎 {topic} golden rule:\n\nDon't just write code.\nWrite code that tells a story.\n\n{engagement_hook}\n\n{hashtags}",
-            f"📈 Boost your {topic} skills:\n\nKey focus areas:\n• Core concepts\n• Best practices\n• Real projects\n\n{engagement_hook}\n\n{hashtags}",
-            f"⚡ Quick {topic} tip:\n\nAlways remember:\nCode for humans first,\ncomputers second.\n\n{engagement_hook}\n\n{hashtags}",
-            f"🎯 {topic} challenge:\n\nBuild something useful today.\nShare your progress.\nSupport others.\n\n{engagement_hook}\n\n{hashtags}"
-        ]
-        
-        return random.choice(templates)
+        with metrics.timed('generate_content', source='mock'):
+            return self.mock_engine.render(topic=topic)
 
-    def generate_content(self) -> str:
-        """Generate personalized content using OpenAI or fallback to mock content"""
+    def generate_mock_batch(self, n: int, seed=None, topic: str = None, timeless: bool = False) -> List[str]:
+        """Generate n distinct mock tweets in one pass with an optionally seeded RNG"""
+        with metrics.timed('generate_content', source='mock_batch'):
+            return self.mock_engine.generate_batch(n, seed=seed, topic=topic, timeless=timeless)
+
+    def build_prompt(self, content_type: str, topic: str) -> str:
+        """Build the completion prompt for a content type and topic"""
+        return f"""Generate a Twitter post ({content_type}) about {topic}.
+                Make it engaging, informative, and conversational.
+                Include relevant hashtags (max {self.max_hashtags}).
+                Keep it under {self.tweet_length} characters.
+                Focus on providing value to tech-savvy audience."""
+
+    def generate_content_batch(self, content_type: str, topic: str, n: int = 1) -> List[str]:
+        """Generate n completions for one prompt in a single OpenAI request"""
+        response = openai.Completion.create(
+            api_key=self.openai_api_key,
+            engine="gpt-3.5-turbo-instruct",
+            prompt=self.build_prompt(content_type, topic),
+            max_tokens=100,
+            temperature=self.content_temperature,
+            n=n,
+            request_timeout=self.openai_deadline or None
+        )
+        return [choice.text.strip() for choice in response.choices if choice.text.strip()]
+
+    def complete(self, content_type: str, topic: str, n: int = 1, bounded: bool = False,
+                 keep_late: bool = True) -> List[str]:
+        """Generate completions with retries, failing fast while OpenAI's circuit is open
+
+        A bounded call makes a single attempt (plus an optional hedged
+        request) that gives up at OPENAI_DEADLINE; completions arriving
+        after it gave up are kept in the generation cache unless keep_late
+        is False.
+        """
+        completion = metrics.instrument(self.generate_content_batch, 'generate_content', source='openai')
+        if bounded and self.openai_deadline:
+            key = self.generation_key(content_type, topic)
+            return self.openai_breaker.call(
+                self.openai_hedger.call,
+                functools.partial(completion, content_type, topic, n),
+                on_discard=(lambda contents: self.generation_cache.put(key, contents, content_type, topic))
+                if keep_late else None
+            )
+        return self.openai_breaker.call(self.openai_retry.call, completion, content_type, topic, n)
+
+    def generation_key(self, content_type: str, topic: str) -> str:
+        """Generation cache key for everything that shapes a completion"""
+        return prompt_key(self.build_prompt(content_type, topic), self.content_temperature)
+
+    def take_cached(self, content_type: str, topic: str, n: int = 1) -> List[Dict]:
+        """Take up to n unused cached generations, preferring the same prompt"""
+        try:
+            entries = self.generation_cache.take(self.generation_key(content_type, topic), n)
+            if len(entries) < n:
+                entries += self.generation_cache.take(None, n - len(entries))
+        except Exception as e:
+            logger.error("Error reading generation cache: %s", e)
+            return []
+        metrics.counter('generation_cache_served_total', 'Cached generations used instead of OpenAI').inc(len(entries))
+        return entries
+
+    def generate_content(self, read_only: bool = False) -> Dict:
+        """Generate personalized content using OpenAI or fallback to cached or mock content
+
+        Returns a draft dict with 'content', 'content_type', 'topic' and
+        'source', or None. With read_only (dry runs) the generation cache is
+        left untouched: no spare completions are stored and none are taken
+        from it.
+        """
         try:
             content_type = random.choice(self.content_types)
             topic = random.choice(self.topics_of_interest)
             
             try:
-                prompt = f"""Generate a Twitter post ({content_type}) about {topic}.
-                Make it engaging, informative, and conversational.
-                Include relevant hashtags (max {self.max_hashtags}).
-                Keep it under {self.tweet_length} characters.
-                Focus on providing value to tech-savvy audience."""
-                
-                response = openai.Completion.create(
-                    engine="gpt-3.5-turbo-instruct",
-                    prompt=prompt,
-                    max_tokens=100,
-                    temperature=self.content_temperature,
-                    n=1
-                )
-                
-                content = response.choices[0].text.strip()
+                # Ask for a spare completion while this prompt's cache is short; it costs
+                # only output tokens and is what gets served when OpenAI is down
+                key = self.generation_key(content_type, topic)
+                short = not read_only and self.generation_cache.count(key) < self.generation_cache_per_prompt
+                contents = self.complete(content_type, topic, n=2 if short else 1, bounded=True,
+                                         keep_late=not read_only)
+                draft = {'content': contents[0], 'content_type': content_type, 'topic': topic, 'source': 'openai'}
+                if not read_only:
+                    self.generation_cache.put(key, contents[1:], content_type, topic)
             except Exception as e:
-                logger.warning(f"OpenAI generation failed, falling back to mock content: {str(e)}")
-                content = self.generate_mock_content()
-            
-            logger.info(f"Generated content: {content}")
-            return content
+                if not isinstance(e, CircuitOpenError):
+                    logger.warning("OpenAI generation failed, falling back to cached or mock content: %s", e)
+                cached = [] if read_only else self.take_cached(content_type, topic)
+                if cached:
+                    draft = dict(cached[0], source='openai')
+                else:
+                    draft = self.mock_draft(self.generate_mock_content(topic), topic)
+
+            logger.debug("Generated content: %s", draft['content'])
+            return draft
         except Exception as e:
             logger.error(f"Error generating content: {str(e)}")
             return None
 
+    @staticmethod
+    def mock_draft(content: str, topic: str) -> Dict:
+        """Draft of mock content; mock templates don't follow the content types"""
+        return {'content': content, 'content_type': 'mock', 'topic': topic, 'source': 'mock'}
+
+    def generate_pool_batch(self) -> List[Dict]:
+        """Generate, format and validate a batch of drafts for the content pool"""
+        with self._prompt_lock:
+            content_type, topic = next(self._prompt_cycle)
+
+        try:
+            generated = [
+                {'content': content, 'content_type': content_type, 'topic': topic, 'source': 'openai'}
+                for content in self.complete(content_type, topic, n=self.content_batch_size)
+            ]
+        except Exception as e:
+            if not isinstance(e, CircuitOpenError):
+                logger.warning("OpenAI batch generation failed, filling pool with cached or mock content: %s", e)
+            generated = [dict(entry, source='openai') for entry in self.take_cached(content_type, topic, self.content_batch_size)]
+            # Pooled drafts may be posted hours later, so they get no time-of-day intro
+            generated += [
+                self.mock_draft(content, topic)
+                for content in self.generate_mock_batch(
+                    self.content_batch_size - len(generated), topic=topic, timeless=True
+                )
+            ]
+
+        drafts = []
+        for draft in generated:
+            formatted_content = self.format_tweet(draft['content'])
+            if formatted_content and weighted_length(formatted_content) <= self.tweet_length:
+                drafts.append(dict(draft, content=formatted_content))
+        return drafts
+
+    def start_content_pool(self):
+        """Start pre-generating tweets in the background"""
+        self.content_pool.start()
+
+    def stop_content_pool(self):
+        """Stop the content pool, keeping its unposted OpenAI drafts in the generation cache"""
+        self.content_pool.stop()
+        for draft in self.content_pool.drain():
+            if draft.get('source') == 'openai':
+                key = self.generation_key(draft['content_type'], draft['topic'])
+                self.generation_cache.put(key, [draft['content']], draft['content_type'], draft['topic'])
+
     def format_tweet(self, content: str) -> str:
         """Format and clean up tweet content"""
         try:
-            # Remove extra whitespace and newlines
-            content = ' '.join(content.split())
-            
-            # Ensure proper hashtag formatting
-            content = re.sub(r'(?<!&)#', ' #', content)
-            
-            # Truncate if too long
-            if len(content) > self.tweet_length:
-                content = content[:self.tweet_length-3] + "..."
-            
-            return content
+            # Collapse whitespace, separate hashtags and truncate by Twitter's weighted length
+            with metrics.timed('format_tweet'):
+                return normalize_tweet(content, self.tweet_length)
         except Exception as e:
             logger.error(f"Error formatting tweet: {str(e)}")
             return content
 
+    def is_near_duplicate(self, content: str) -> bool:
+        """Check formatted content against everything already posted"""
+        match = self.post_index.query(content)
+        if match:
+            tweet_id, similarity = match
+            logger.info("Rejected near-duplicate of tweet %s (similarity %.2f)", tweet_id, similarity)
+            return True
+        return False
+
+    def next_draft(self) -> Dict:
+        """Get a formatted draft that is not a near-duplicate of a past post"""
+        for _ in range(self.dedup_max_attempts):
+            # Prefer a pre-generated draft so posting only waits on create_tweet
+            draft = self.content_pool.get()
+            if not draft:
+                draft = self.generate_content()
+                if not draft:
+                    continue
+                draft['content'] = self.format_tweet(draft['content'])
+
+            if not self.is_near_duplicate(draft['content']):
+                return draft
+        return None
+
+    def call_twitter(self, endpoint: str, func, *args, **kwargs):
+        """Call a Twitter endpoint with retries, timing every attempt
+
+        Raises RateLimited instead of calling once the endpoint's budget is used up.
+        """
+        request = metrics.instrument(func, 'twitter_request', endpoint=endpoint)
+
+        @functools.wraps(request)
+        def attempt(*args, **kwargs):
+            self.rate_limits.check(endpoint)
+            try:
+                return request(*args, **kwargs)
+            except tweepy.errors.TooManyRequests:
+                # Retrying before the window resets is pointless when we know when that is
+                budget = self.rate_limits.budget(endpoint)
+                if budget is None:
+                    raise
+                raise RateLimited(endpoint, budget.reset_at) from None
+
+        return self.twitter_retry.call(attempt, *args, **kwargs)
+
     def post_tweet(self) -> bool:
-        """Post a tweet with generated content"""
+        """Post a tweet with generated content
+
+        create_tweet is retried with the same text on transient errors. If a
+        retry is refused as a duplicate, an earlier attempt probably posted
+        the tweet, so that counts as posted rather than posting new content.
+        """
         for _ in range(self.max_retries):
+            draft = self.next_draft()
+            if not draft:
+                continue
+            formatted_content = draft['content']
+            attempts = 0
+
+            def create_tweet(**kwargs):
+                nonlocal attempts
+                attempts += 1
+                return self.client.create_tweet(**kwargs)
+
             try:
-                content = self.generate_content()
-                if not content:
-                    continue
-                
-                formatted_content = self.format_tweet(content)
-                response = self.client.create_tweet(text=formatted_content)
-                
-                if response.data:
-                    tweet_id = response.data['id']
-                    self.post_history.append({
-                        'id': tweet_id,
-                        'content': formatted_content,
-                        'timestamp': datetime.now().isoformat()
-                    })
-                    self.save_state()
-                    logger.info(f"Successfully posted tweet: {formatted_content}")
-                    return True
-                
+                # Transient failures retry with the same content instead of regenerating
+                response = self.call_twitter('create_tweet', create_tweet, text=formatted_content)
             except Exception as e:
-                logger.error(f"Error posting tweet: {str(e)}")
-                time.sleep(5)  # Wait before retry
+                if is_content_rejection(e) and attempts > 1:
+                    # An earlier attempt may have posted before failing; new content would post twice
+                    logger.warning("Retried tweet rejected as a duplicate, so it was probably posted: %s", e)
+                    return True
+                if is_content_rejection(e):
+                    logger.warning("Tweet content rejected, regenerating: %s", e)
+                    continue
+                logger.error("Error posting tweet: %s", e)
+                return False
+
+            if response.data:
+                tweet_id = response.data['id']
+                entry = {
+                    'id': tweet_id,
+                    'content': formatted_content,
+                    'timestamp': datetime.now().isoformat()
+                }
+                for key in ('content_type', 'topic'):
+                    if key in draft:
+                        entry[key] = draft[key]
+                self.record_post(entry)
+                logger.info("Successfully posted tweet %s", tweet_id)
+                logger.debug("Posted content: %s", formatted_content)
+                return True
         
         return False
 
+    def search_stream(self, planned) -> Iterator[List]:
+        """Lazily page through one planned search, yielding each page's qualifying tweets
+
+        Only tweets newer than the topics' cursors are fetched, and a page
+        is only requested when the consumer asks for more, up to
+        SEARCH_MAX_PAGES. Qualifying tweets have more likes than the
+        engagement threshold and were not engaged with yet.
+        """
+        # A combined query can only resume from the oldest cursor among its topics
+        cursors = [usable_since_id(self.search_cursors.get(topic)) for topic in planned.topics]
+        since_id = None if None in cursors else min(cursors, key=int)
+
+        # Paginator picks next_token over pagination_token by the method's name
+        @functools.wraps(self.client.search_recent_tweets)
+        def search(*args, **kwargs):
+            return self.call_twitter('search_recent_tweets', self.client.search_recent_tweets, *args, **kwargs)
+
+        page_size = self.page_sizer.size(planned.query)
+        pages = iter(tweepy.Paginator(
+            search,
+            query=planned.query,
+            since_id=since_id,
+            max_results=page_size,
+            tweet_fields=['author_id', 'public_metrics']
+        ))
+        for number in range(self.search_max_pages):
+            try:
+                response = next(pages)
+            except StopIteration:
+                return
+            except RateLimited:
+                if number == 0:
+                    raise
+                # Keep what the earlier pages found
+                return
+            tweets = response.data or []
+            meta = response.meta or {}
+            metrics.counter('search_pages_total', 'Search result pages fetched').inc()
+
+            if number == 0:
+                # The first page holds the newest results; the next pass only fetches newer ones
+                newest_id = meta.get('newest_id')
+                if newest_id:
+                    for topic, cursor in zip(planned.topics, cursors):
+                        if newer_id(cursor, newest_id) != cursor:
+                            self.record_event('cursor', {'topic': topic, 'since_id': str(newest_id)})
+
+            qualifying = [
+                tweet for tweet in tweets
+                if (tweet.public_metrics or {}).get('like_count', 0) > self.engagement_scoring.like_threshold
+                and tweet.id not in self.engagement_history
+            ]
+            exhausted = 'next_token' not in meta
+            self.page_sizer.record(planned.query, page_size, len(tweets), len(qualifying), last=exhausted)
+            yield qualifying
+            if exhausted:
+                return
+
+    def search_query(self, planned) -> List:
+        """Run one planned search, paging until it found enough candidates or used its page budget"""
+        cached = self.search_cache.get(planned.query)
+        if cached is not None:
+            return cached
+
+        results = []
+        pages = 0
+        for page in self.search_stream(planned):
+            results.extend(page)
+            pages += 1
+            if len(results) >= self.search_target_candidates:
+                break
+        logger.debug("Search for %s found %d candidates in %d pages", planned.topics, len(results), pages)
+        self.search_cache.put(planned.query, results)
+        return results
+
+    def search_topics(self, topics: List[str]) -> Dict:
+        """Search all topics concurrently and merge results into one candidate set
+
+        Returns {tweet_id: (tweet, matched topics)}.
+        """
+        # Topics deferred by the search budget last time go first
+        deferred = [topic for topic in self.deferred_topics if topic in topics]
+        topics = deferred + [topic for topic in topics if topic not in deferred]
+        plan = self.query_planner.plan(topics)
+        logger.info("Searching %d topics with %d requests (%d saved by query coalescing)",
+                    len(topics), len(plan), len(topics) - len(plan))
+        metrics.counter('search_requests_saved_total', 'Search requests saved by query coalescing').inc(
+            len(topics) - len(plan))
+
+        budget = self.rate_limits.remaining('search_recent_tweets')
+        self.deferred_topics = []
+        if budget is not None and budget < len(plan):
+            self.deferred_topics = [topic for planned in plan[budget:] for topic in planned.topics]
+            plan = plan[:budget]
+            logger.warning("Search budget allows %d requests; deferring %d topics to the next pass",
+                           budget, len(self.deferred_topics))
+
+        candidates = {}
+        workers = min(self.search_concurrency, len(plan)) or 1
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='search') as executor:
+            futures = [(planned, executor.submit(self.search_query, planned)) for planned in plan]
+            for planned, future in futures:
+                try:
+                    tweets = future.result()
+                except RateLimited:
+                    self.deferred_topics.extend(planned.topics)
+                    continue
+                except Exception as e:
+                    logger.error("Error searching topics %s: %s", planned.topics, e)
+                    continue
+                for tweet in tweets:
+                    matched = self.query_planner.route(tweet.text, planned.topics)
+                    if tweet.id in candidates:
+                        candidates[tweet.id][1].extend(t for t in matched if t not in candidates[tweet.id][1])
+                    else:
+                        candidates[tweet.id] = (tweet, matched)
+        return candidates
+
+    def select_candidates(self, candidates: Dict) -> List:
+        """Score every new candidate of a pass and keep the best engagement_count
+
+        Returns [(tweet_id, score)], best first.
+        """
+        with metrics.timed('score_candidates'):
+            claimed = self.shard.claimed(candidates) if self.shard else ()
+            columns = CandidateColumns.from_tweets(
+                tweet for tweet_id, (tweet, _) in candidates.items()
+                if tweet_id not in self.engagement_history and str(tweet_id) not in claimed
+            )
+            selected = columns.top_k(self.engagement_count, self.engagement_scoring)
+        metrics.gauge('engagement_candidates', 'New candidates scored in the last engagement pass').set(len(columns))
+        return selected
+
     def engage_with_community(self):
         """Smart engagement with relevant tweets"""
         try:
-            # Search for relevant tweets
-            for topic in self.topics_of_interest:
-                query = f"{topic} -is:retweet -is:reply lang:en"
-                tweets = self.client.search_recent_tweets(
-                    query=query,
-                    max_results=10,
-                    tweet_fields=['author_id', 'public_metrics']
-                )
-                
-                if not tweets.data:
+            # Forget engagements older than the recent-search window
+            with self._state_lock:
+                self.engagement_history.evict()
+
+            topics = self.topics_of_interest
+            if self.shard:
+                self.shard.forget_engagements(self.engagement_ttl_hours * 3600)
+                self.shard.heartbeat()
+                topics = self.shard.assigned(topics)
+                if not topics:
+                    logger.info("No topic partitions leased to this worker; skipping engagement")
+                    return
+
+            # Search for relevant tweets across all (of this worker's) topics at once
+            candidates = self.search_topics(topics)
+
+            # Queue a like and retweet for the best-scoring tweets of the whole pass;
+            # the action queue sends them out at the configured pace
+            matched_topics = {str(tweet_id): topics for tweet_id, (_, topics) in candidates.items()}
+            for tweet_id, score in self.select_candidates(candidates):
+                if self.shard and not self.shard.claim_engagement(tweet_id):
+                    # Another worker found the same tweet in its own partitions
                     continue
-                
-                for tweet in tweets.data:
-                    # Check if we've already engaged with this tweet
-                    if tweet.id in self.engagement_history:
-                        continue
-                    
-                    # Like and retweet if meets criteria
-                    metrics = tweet.public_metrics
-                    if metrics['like_count'] > self.min_engagement_followers:
-                        self.client.like(tweet.id)
-                        self.client.retweet(tweet.id)
-                        
-                        self.engagement_history[tweet.id] = {
-                            'type': 'like_retweet',
-                            'timestamp': datetime.now().isoformat()
-                        }
-                        logger.info(f"Engaged with tweet {tweet.id}")
-                        
-                        # Save state after each engagement
-                        self.save_state()
-                        
-                        # Rate limiting
-                        time.sleep(60 / self.engagement_count)
-                        
+                topics = matched_topics.get(str(tweet_id), [])
+                self.record_engagement(tweet_id, {
+                    'type': 'like_retweet',
+                    'score': round(score, 2),
+                    'topics': topics,
+                    'timestamp': datetime.now().isoformat()
+                })
+                for topic in topics:
+                    metrics.counter('engagements_total', 'Tweets engaged with, by matched topic', topic=topic).inc()
+                for endpoint in ('like', 'retweet'):
+                    self.record_event('action', {'endpoint': endpoint, 'tweet_id': str(tweet_id)})
+                logger.info("Queued engagement with tweet %s (score %.1f)", tweet_id, score)
+            metrics.gauge('action_queue_pending', 'Engagement actions waiting to be sent').set(len(self.action_queue))
+
         except Exception as e:
-            logger.error(f"Error in community engagement: {str(e)}")
+            logger.error("Error in community engagement: %s", e)
 
-def main():
-    bot = TwitterBot()
-    
-    def job():
+    def perform_action(self, endpoint: str, tweet_id: str):
+        """Send one queued engagement action; called by the action queue
+
+        Returns the seconds to wait before retrying when the endpoint is out
+        of budget, so the action stays queued.
+        """
         try:
-            bot.post_tweet()
-            logger.info("Scheduled tweet posted successfully")
+            func = {'like': self.client.like, 'retweet': self.client.retweet}[endpoint]
+            self.call_twitter(endpoint, func, tweet_id)
+            logger.info("Sent %s for tweet %s", endpoint, tweet_id)
+        except (RateLimited, tweepy.errors.TooManyRequests):
+            # Without rate-limit headers, try again in a minute
+            return self.rate_limits.reset_in(endpoint) or 60
         except Exception as e:
-            logger.error(f"Error in scheduled tweet: {str(e)}")
+            logger.error("Error sending %s for tweet %s: %s", endpoint, tweet_id, e)
+        self.record_event('action_done', {'endpoint': endpoint, 'tweet_id': tweet_id})
+        metrics.gauge('action_queue_pending', 'Engagement actions waiting to be sent').set(len(self.action_queue))
+
+    def start_action_queue(self):
+        """Start sending queued engagement actions in the background"""
+        self.action_queue.start()
+
+    def refresh_post_metrics(self) -> int:
+        """Fetch current metrics of recent posts, 100 per lookup, into the analytics store
+
+        Returns the number of posts refreshed.
+        """
+        try:
+            with self._state_lock:
+                posts = [post for post in self.post_history if post['id'] not in self.analytics]
+            self.analytics.add_posts([dict(post, posted_at=snowflake_timestamp(post['id'])) for post in posts])
+
+            due = self.analytics.due_for_refresh(
+                window=self.analytics_window_days * 86400,
+                interval=self.analytics_refresh_hours * 3600 * 0.9
+            )
+            for start in range(0, len(due), 100):
+                if not self.rate_limits.available('get_tweets'):
+                    # The rest stays due and is picked up by the next run
+                    logger.warning("Lookup budget exhausted; deferring %d posts", len(due) - start)
+                    due = due[:start]
+                    break
+                ids = due[start:start + 100]
+                response = self.call_twitter('get_tweets', self.client.get_tweets, ids, tweet_fields=['public_metrics'])
+                found = {str(tweet.id): tweet.public_metrics for tweet in response.data or []}
+                # Tweets missing from the response were deleted; only mark them refreshed
+                self.analytics.update_metrics({tweet_id: found.get(tweet_id) for tweet_id in ids})
+            logger.info("Refreshed metrics for %d posts in %d requests", len(due), -(-len(due) // 100))
+            return len(due)
+        except Exception as e:
+            logger.error("Error refreshing post metrics: %s", e)
+            return 0
+
+    def schedule(self, scheduler: EventScheduler, prefix: str = ''):
+        """Register this bot's post and engagement jobs with a scheduler"""
+        def post_job():
+            if self.shard:
+                if not self.shard.is_leader():
+                    return
+                self.sync_shared_posts()
+            reset_in = self.rate_limits.reset_in('create_tweet')
+            if reset_in:
+                retry_at = datetime.now() + timedelta(seconds=reset_in + 1)
+                logger.warning(f"{prefix}Tweet budget exhausted; deferring post to {retry_at.strftime('%H:%M:%S')}")
+                scheduler.run_once_at(f"{prefix}post", retry_at)
+                return
+            if self.post_tweet():
+                logger.info(f"{prefix}Scheduled tweet posted successfully")
+            else:
+                logger.error(f"{prefix}Scheduled tweet failed to post")
+
+        def engage_job():
+            self.engage_with_community()
+            logger.info(f"{prefix}Scheduled community engagement finished")
+
+        def refresh_job():
+            if not self.shard or self.shard.is_leader():
+                self.refresh_post_metrics()
+
+        # Post and engage at specific times (all times in 24-hour format)
+        scheduler.every_day_at(f"{prefix}post", self.post_times, post_job)
+        scheduler.every_day_at(f"{prefix}engage", self.engage_times, engage_job)
+        scheduler.every(f"{prefix}refresh_metrics", timedelta(hours=self.analytics_refresh_hours), refresh_job)
+        if self.shard:
+            # Renew leases well before they expire; posting, the content pool and
+            # metric refreshes run only on the worker holding partition 0
+            self.shard_heartbeat()
+            scheduler.every(f"{prefix}shard_heartbeat", timedelta(seconds=self.shard.lease_seconds / 3),
+                            self.shard_heartbeat)
+
+def start_metrics_export(scheduler: EventScheduler):
+    """Expose metrics over HTTP and/or as a periodic snapshot file, as configured"""
+    port = os.getenv('METRICS_PORT')
+    if port:
+        metrics.serve(int(port))
+    snapshot_path = os.getenv('METRICS_SNAPSHOT_PATH')
+    if snapshot_path:
+        interval = timedelta(seconds=float(os.getenv('METRICS_SNAPSHOT_INTERVAL', 60)))
+        scheduler.every("metrics_snapshot", interval, lambda: metrics.write_snapshot(snapshot_path))
+
+def main(worker: str = None):
+    # With SHARD_DB set, several workers split topics_of_interest between them;
+    # each keeps its own state files
+    state_path, scheduler_path, shard = 'bot_state.json', 'scheduler_state.json', None
+    shard_db = os.getenv('SHARD_DB')
+    if shard_db:
+        worker = worker or default_worker_id()
+        if not worker:
+            raise ValueError("SHARD_DB needs a stable worker name: pass --worker or set SHARD_WORKER")
+        shard = ShardCoordinator(
+            shard_db,
+            worker,
+            partitions=int(os.getenv('SHARD_PARTITIONS', 16)),
+            lease_seconds=float(os.getenv('SHARD_LEASE_SECONDS', 60))
+        )
+        state_path = worker_state_path(state_path, shard.worker_id)
+        scheduler_path = worker_state_path(scheduler_path, shard.worker_id)
+        logger.info(f"Running as shard worker {shard.worker_id}")
+
+    bot = TwitterBot(state_path=state_path, shard=shard)
+    if not shard:
+        # Shard workers start the pool once they lead (see shard_heartbeat)
+        bot.start_content_pool()
+    bot.start_action_queue()
 
-    # Schedule tweets at specific times (all times in 24-hour format)
-    schedule.every().day.at("09:00").do(job)  # Morning tweet
-    schedule.every().day.at("13:00").do(job)  # Afternoon tweet
-    schedule.every().day.at("17:00").do(job)  # Evening tweet
+    scheduler = EventScheduler(state_path=scheduler_path)
+    scheduler.stop_on_signals()
+    bot.schedule(scheduler)
+    start_metrics_export(scheduler)
     
     logger.info("Bot started. Waiting for scheduled times...")
     
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute
+    try:
+        scheduler.run_forever()
+    finally:
+        scheduler.stop()
+        bot.stop_content_pool()
+        bot.action_queue.stop()
+        if shard:
+            # Let the other workers take over our topics right away
+            shard.release()
+        # Fold the journal into a snapshot on shutdown
+        bot.save_state()
 
 if __name__ == "__main__":
+    setup_logging()
     main()